@@ -1,16 +1,38 @@
+import asyncio
 import logging
+import time
 import voluptuous as vol
 
-from .const import DOMAIN, CONF_PUBLICAPI, LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, \
-    LIGHTWAVE_WEBHOOK, LIGHTWAVE_WEBHOOKID, LIGHTWAVE_LINKID, SERVICE_RECONNECT, SERVICE_WHDELETE, SERVICE_UPDATE
+from .const import DOMAIN, CONF_PUBLICAPI, CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW, CONF_ATTRIBUTE_PROFILE, ATTRIBUTE_PROFILE_FULL, \
+    CONF_SERVER_URL, CONF_ENERGY_STATISTICS, LIGHTWAVE_STATISTICS, LIGHTWAVE_RESYNC, \
+    CONF_RECONCILE_PERIOD, CONF_RECONCILE_BUDGET, DEFAULT_RECONCILE_PERIOD, DEFAULT_RECONCILE_BUDGET, LIGHTWAVE_RECONCILER, \
+    LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_ATTRIBUTES, LIGHTWAVE_TIMINGS, LIGHTWAVE_DISCOVERY, \
+    LIGHTWAVE_WEBHOOK, LIGHTWAVE_WEBHOOKID, LIGHTWAVE_WEBHOOK_ENTRIES, LIGHTWAVE_LINKID, LIGHTWAVE_ROUTER, LIGHTWAVE_COALESCER, \
+    LIGHTWAVE_COMMANDS, LIGHTWAVE_OPTIMISTIC, LIGHTWAVE_METRICS, CONFIRM_TIMEOUT, \
+    SERVICE_RECONNECT, SERVICE_WHDELETE, SERVICE_UPDATE, SERVICE_BULK_SET, BULK_MAX_CONCURRENCY, \
+    REFRESH_RETRY_DELAY, REFRESH_MAX_RETRY_DELAY
+from .attributes import LWRF2AttributeCache
+from .coalescer import LWRF2StateCoalescer
+from .commands import LWRF2CommandQueue, async_bulk_write
+from .discovery import LWRF2Discovery
+from .energy_statistics import LWRF2EnergyStatistics
+from .metrics import LWRF2Metrics
+from .optimistic import LWRF2OptimisticTracker
+from .reconcile import LWRF2Reconciler
+from .resync import LWRF2Resync, async_read_changes
+from .router import LWRF2FeatureRouter
+from .snapshot import get_store, serialize_hierarchy, restore_hierarchy, hierarchy_signature, get_feature_states, \
+    copy_missing_states
 from homeassistant.config_entries import ConfigEntry    
-from homeassistant.const import (CONF_USERNAME, CONF_PASSWORD)
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import (CONF_USERNAME, CONF_PASSWORD, ATTR_ENTITY_ID, ATTR_DEVICE_ID, ATTR_AREA_ID, ENTITY_MATCH_ALL)
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_extract_entity_ids
 
 _LOGGER = logging.getLogger(__name__)
+_CLOUD_SERVERS = {}
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -22,16 +44,19 @@ CONFIG_SCHEMA = vol.Schema(
     extra=vol.ALLOW_EXTRA,
 )
 
+PLATFORMS = ["switch", "light", "climate", "cover", "binary_sensor", "sensor", "lock", "event"]
+
 async def handle_webhook(hass, webhook_id, request):
     """Handle webhook callback."""
-    for entry_id in hass.data[DOMAIN]:
-        link = hass.data[DOMAIN][entry_id][LIGHTWAVE_LINK2]
-        body = await request.json()
-        _LOGGER.debug("Received webhook: %s ", body)
-        link.process_webhook_received(body)
-        for ent in hass.data[DOMAIN][entry_id][LIGHTWAVE_ENTITIES]:
-            if ent.hass is not None:
-                ent.async_schedule_update_ha_state(True)
+    entry_id = hass.data.get(LIGHTWAVE_WEBHOOK_ENTRIES, {}).get(webhook_id)
+    if entry_id is None or entry_id not in hass.data[DOMAIN]:
+        _LOGGER.warning("Received webhook for unknown webhook id: %s ", webhook_id)
+        return
+    body = await request.json()
+    _LOGGER.debug("Received webhook: %s ", body)
+    hass.data[DOMAIN][entry_id][LIGHTWAVE_METRICS].record_event()
+    router = hass.data[DOMAIN][entry_id][LIGHTWAVE_ROUTER]
+    router.dispatch_feature_event(body['triggerEvent']['id'], body['payload']['value'])
 
 def async_central_callback(**kwargs):
     _LOGGER.debug("Central callback")
@@ -47,12 +72,44 @@ async def async_setup(hass, config):
 
     async def service_handle_update_states(call):
         _LOGGER.debug("Received service call update states")
-        for entry_id in hass.data[DOMAIN]:
-            link = hass.data[DOMAIN][entry_id][LIGHTWAVE_LINK2]
-            await link.async_update_featureset_states()
-            for ent in hass.data[DOMAIN][entry_id][LIGHTWAVE_ENTITIES]:
-                if ent.hass is not None:
-                    ent.async_schedule_update_ha_state(True)
+        started = time.monotonic()
+        targeted = call.data.get(ATTR_ENTITY_ID, ENTITY_MATCH_ALL) != ENTITY_MATCH_ALL \
+            or ATTR_DEVICE_ID in call.data or ATTR_AREA_ID in call.data
+        entity_ids = await async_extract_entity_ids(hass, call) if targeted else None
+        entries = {}
+
+        for entry_id, entry_data in hass.data[DOMAIN].items():
+            start = time.monotonic()
+            link = entry_data[LIGHTWAVE_LINK2]
+            router = entry_data[LIGHTWAVE_ROUTER]
+            if entity_ids is None:
+                featureset_ids = set(link.featuresets)
+            else:
+                # Only read the targets' featuresets, entities are written when their features changed
+                featureset_ids = {ent._featureset_id for ent in entry_data[LIGHTWAVE_ENTITIES] if ent.entity_id in entity_ids}
+                if not featureset_ids:
+                    continue
+            feature_ids = {feature.id for featureset_id in featureset_ids
+                           for feature in link.featuresets[featureset_id].features.values()}
+            read, changed = await async_read_changes(link, router, feature_ids, call.data["max_concurrency"])
+            if entity_ids is None:
+                # Without a target every entity is written, whether its features changed or not
+                router.invalidate()
+                coalescer = entry_data[LIGHTWAVE_COALESCER]
+                for ent in entry_data[LIGHTWAVE_ENTITIES]:
+                    if ent.hass is not None:
+                        coalescer.async_schedule(ent)
+            entries[entry_id] = {
+                "featuresets": len(featureset_ids),
+                "features": len(feature_ids),
+                "read": read,
+                "changed": changed,
+                "elapsed": round(time.monotonic() - start, 3),
+            }
+
+        elapsed = time.monotonic() - started
+        _LOGGER.debug("Update states took %.3f s: %s", elapsed, entries)
+        return {"elapsed": round(elapsed, 3), "entries": entries}
 
     async def service_handle_delete_webhook(call):
         _LOGGER.debug("Received service call delete webhook")
@@ -61,9 +118,60 @@ async def async_setup(hass, config):
             link = hass.data[DOMAIN][entry_id][LIGHTWAVE_LINK2]
             await link.async_delete_webhook(wh_name)
 
+    async def service_handle_bulk_set(call):
+        _LOGGER.debug("Received service call bulk set")
+        started = time.monotonic()
+        entity_ids = await async_extract_entity_ids(hass, call)
+        values = call.data["values"]
+        results = {}
+
+        for entry_id, entry_data in hass.data[DOMAIN].items():
+            link = entry_data[LIGHTWAVE_LINK2]
+            # Entities sharing a featureset (e.g. a light and its LED) are written once
+            targets = {}
+            owners = {}
+            for ent in entry_data[LIGHTWAVE_ENTITIES]:
+                if ent.entity_id not in entity_ids:
+                    continue
+                features = link.featuresets[ent._featureset_id].features
+                missing = [feature for feature in values if feature not in features]
+                if missing:
+                    results[ent.entity_id] = {"success": False, "error": f"Unsupported features: {', '.join(missing)}"}
+                    continue
+                targets[ent._featureset_id] = [(features[feature].id, value) for feature, value in values.items()]
+                owners.setdefault(ent._featureset_id, []).append(ent.entity_id)
+
+            errors = await async_bulk_write(link, targets, max_concurrency=call.data["max_concurrency"],
+                                            metrics=entry_data[LIGHTWAVE_METRICS])
+            for featureset_id, error in errors.items():
+                for entity_id in owners[featureset_id]:
+                    results[entity_id] = {"success": error is None, "error": error}
+
+        for entity_id in entity_ids:
+            results.setdefault(entity_id, {"success": False, "error": "Not a Lightwave entity"})
+
+        elapsed = time.monotonic() - started
+        _LOGGER.debug("Bulk set of %s entities took %.3f s", len(results), elapsed)
+        return {"elapsed": round(elapsed, 3), "results": results}
+
     hass.services.async_register(DOMAIN, SERVICE_RECONNECT, service_handle_reconnect)
     hass.services.async_register(DOMAIN, SERVICE_WHDELETE, service_handle_delete_webhook)
-    hass.services.async_register(DOMAIN, SERVICE_UPDATE, service_handle_update_states)
+    hass.services.async_register(
+        DOMAIN, SERVICE_UPDATE, service_handle_update_states,
+        schema=vol.Schema({
+            **cv.ENTITY_SERVICE_FIELDS,
+            vol.Optional("max_concurrency", default=BULK_MAX_CONCURRENCY): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+        }),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_BULK_SET, service_handle_bulk_set,
+        schema=cv.make_entity_service_schema({
+            vol.Required("values"): vol.Schema({cv.string: vol.Coerce(int)}),
+            vol.Optional("max_concurrency", default=BULK_MAX_CONCURRENCY): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+        }),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     
     return True
 
@@ -74,29 +182,64 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     hass.data[DOMAIN].setdefault(config_entry.entry_id, {})
     email = config_entry.data[CONF_USERNAME]
     password = config_entry.data[CONF_PASSWORD]
-    config_entry.add_update_listener(reload_lw)
+    config_entry.async_on_unload(config_entry.add_update_listener(reload_lw))
 
     publicapi = config_entry.options.get(CONF_PUBLICAPI, False)
+    set_link_servers(lightwave_smart, config_entry.options.get(CONF_SERVER_URL))
     if publicapi:
         _LOGGER.warning("Using Public API, this is experimental - if you have issues turn this off in the integration options")
         link = lightwave_smart.LWLink2Public(email, password)
     else:
         link = lightwave_smart.LWLink2(email, password)
+    metrics = LWRF2Metrics()
+    metrics.watch_connection(link)
 
-    connected = await link.async_connect(max_tries = 1, force_keep_alive_secs=0)
-    if not connected:
-        return False
-    await link.async_get_hierarchy()
+    started = time.monotonic()
+    timings = {}
+    hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_TIMINGS] = timings
+
+    # Build entities from the last good hierarchy if there is one, and read the live one in the background.
+    # The public API builds its hierarchy differently, so always read it live.
+    store = get_store(hass, config_entry.entry_id)
+    snapshot = None if publicapi else await store.async_load()
+    if snapshot is not None:
+        restore_hierarchy(link, snapshot)
+        timings["snapshot_restore"] = time.monotonic() - started
+        _LOGGER.debug("Restored hierarchy snapshot with %s featuresets", len(link.featuresets))
+    else:
+        if not await async_connect_and_read_hierarchy(link, timings, max_tries=1):
+            await async_close_link(link)
+            return False
+        if not publicapi:
+            await store.async_save(serialize_hierarchy(link))
 
     hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2] = link
     hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_ENTITIES] = []
+    router = LWRF2FeatureRouter(link)
+    hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_ROUTER] = router
+    hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_ATTRIBUTES] = LWRF2AttributeCache(
+        link, router, config_entry.options.get(CONF_ATTRIBUTE_PROFILE, ATTRIBUTE_PROFILE_FULL))
+    coalescer = LWRF2StateCoalescer(hass, config_entry.options.get(CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW))
+    hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_COALESCER] = coalescer
+    metrics.bind(router, coalescer)
+    hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_METRICS] = metrics
+    hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_COMMANDS] = LWRF2CommandQueue(hass, link, metrics)
+    optimistic = LWRF2OptimisticTracker(hass, CONFIRM_TIMEOUT)
+    hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_OPTIMISTIC] = optimistic
+    config_entry.async_on_unload(router.add_listener(optimistic.async_feature_update))
     if not publicapi:
         url = None
+        await link.async_register_general_callback(metrics.record_event)
+        # Events sent while the websocket was down are lost, read back what changed after each reconnect
+        resync = LWRF2Resync(hass, link, router, metrics)
+        hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_RESYNC] = resync
+        config_entry.async_on_unload(metrics.add_reconnect_listener(resync.async_schedule))
         # _LOGGER.debug("Register central callback")
         # await link.async_register_callback(async_central_callback)
     else:
         webhook_id = hass.components.webhook.async_generate_id()
         hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_WEBHOOKID] = webhook_id
+        hass.data.setdefault(LIGHTWAVE_WEBHOOK_ENTRIES, {})[webhook_id] = config_entry.entry_id
         _LOGGER.debug("Generated webhook: %s ", webhook_id)
         hass.components.webhook.async_register(
             'lightwave_smart', 'Lightwave webhook', webhook_id, handle_webhook)
@@ -106,6 +249,7 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
 
     hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_WEBHOOK] = url
 
+    start = time.monotonic()
     device_registry = dr.async_get(hass)
     entity_registry = er.async_get(hass)
     for featureset_id, hubname in link.get_hubs():
@@ -138,32 +282,174 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     ):
         _LOGGER.debug("Entity registry item %s", entity_entry)
         _LOGGER.debug("Entity gen2 %s", entity_registry.async_get(entity_entry.entity_id))
+    timings["registry"] = time.monotonic() - start
+
+    # Created ahead of the platforms so the sensor platform adds its mismatch sensor
+    reconcile_period = config_entry.options.get(CONF_RECONCILE_PERIOD, DEFAULT_RECONCILE_PERIOD)
+    if reconcile_period:
+        hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_RECONCILER] = LWRF2Reconciler(
+            hass, link, router, metrics, reconcile_period * 60,
+            config_entry.options.get(CONF_RECONCILE_BUDGET, DEFAULT_RECONCILE_BUDGET))
+
+    start = time.monotonic()
+    hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY] = LWRF2Discovery(link)
+    timings["discovery"] = time.monotonic() - start
+
+    async def async_forward_setup(platform):
+        start = time.monotonic()
+        await hass.config_entries.async_forward_entry_setup(config_entry, platform)
+        timings[f"platform_{platform}"] = time.monotonic() - start
+
+    await asyncio.gather(*(async_forward_setup(platform) for platform in PLATFORMS))
+
+    if config_entry.options.get(CONF_ENERGY_STATISTICS, False):
+        if "recorder" in hass.config.components:
+            statistics = LWRF2EnergyStatistics(hass, link, router, hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY].with_feature("energy"))
+            await statistics.async_start()
+            hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_STATISTICS] = statistics
+        else:
+            _LOGGER.warning("Energy statistics need the recorder, which is not loaded")
+
+    if LIGHTWAVE_RECONCILER in hass.data[DOMAIN][config_entry.entry_id]:
+        hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_RECONCILER].async_start()
+
+    timings["setup_entry"] = time.monotonic() - started
+    _LOGGER.info("Lightwave setup took %.2f seconds (hierarchy from %s)", timings["setup_entry"], "snapshot" if snapshot is not None else "server")
 
-    forward_setup = hass.config_entries.async_forward_entry_setup
-    hass.async_create_task(forward_setup(config_entry, "switch"))
-    hass.async_create_task(forward_setup(config_entry, "light"))
-    hass.async_create_task(forward_setup(config_entry, "climate"))
-    hass.async_create_task(forward_setup(config_entry, "cover"))
-    hass.async_create_task(forward_setup(config_entry, "binary_sensor"))
-    hass.async_create_task(forward_setup(config_entry, "sensor"))
-    hass.async_create_task(forward_setup(config_entry, "lock"))
-    hass.async_create_task(forward_setup(config_entry, "event"))
+    if snapshot is not None:
+        config_entry.async_create_background_task(
+            hass, async_refresh_hierarchy(hass, config_entry, link, store, started), "lightwave_smart hierarchy refresh")
 
     return True
 
+def set_link_servers(lightwave_smart, server_url):
+    """Point the (non-public API) link at a local stand-in server, or back at the Lightwave servers.
+
+    The library reads its server addresses from module globals, so this applies to every entry.
+    """
+    if not _CLOUD_SERVERS:
+        _CLOUD_SERVERS.update(auth=lightwave_smart.AUTH_SERVER, trans=lightwave_smart.TRANS_SERVER)
+    if server_url:
+        server_url = server_url.rstrip("/")
+        _LOGGER.warning("Using Lightwave stand-in server at %s", server_url)
+        lightwave_smart.AUTH_SERVER = f"{server_url}/v2/lightwaverf/autouserlogin/lwapps"
+        lightwave_smart.TRANS_SERVER = server_url.replace("http", "ws", 1) + "/ws"
+    else:
+        lightwave_smart.AUTH_SERVER = _CLOUD_SERVERS["auth"]
+        lightwave_smart.TRANS_SERVER = _CLOUD_SERVERS["trans"]
+
+async def async_connect_and_read_hierarchy(link, timings, max_tries):
+    from lightwave_smart import lightwave_smart
+
+    start = time.monotonic()
+    connected = await link.async_connect(max_tries = max_tries, force_keep_alive_secs=0)
+    timings["connect"] = time.monotonic() - start
+    if not connected:
+        return False
+    start = time.monotonic()
+    if isinstance(link, lightwave_smart.LWLink2Public):
+        # The public API link keeps no features dict, it builds new Feature objects on each read
+        await link.async_get_hierarchy()
+    else:
+        # The link reuses the Feature objects it already has and would add each featureset to them a
+        # second time, calling every featureset callback twice per event. Read into fresh ones.
+        previous_featuresets, previous_features = link.featuresets, link.features
+        link.features = {}
+        try:
+            await link.async_get_hierarchy()
+        except Exception:
+            link.featuresets, link.features = previous_featuresets, previous_features
+            raise
+        copy_missing_states(previous_features, link)
+    timings["hierarchy"] = time.monotonic() - start
+    return True
+
+async def async_refresh_hierarchy(hass, config_entry, link, store, started):
+    """Read the live hierarchy after starting from a snapshot and apply the differences."""
+    timings = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_TIMINGS]
+    signature = hierarchy_signature(link)
+    previous_states = get_feature_states(link)
+
+    retry_delay = REFRESH_RETRY_DELAY
+    while True:
+        try:
+            if await async_connect_and_read_hierarchy(link, timings, max_tries=5):
+                break
+            _LOGGER.warning("Could not connect to Lightwave, showing last known states, retrying in %s seconds", retry_delay)
+        except Exception:
+            # CancelledError is not an Exception, unloading still stops the task
+            _LOGGER.exception("Could not read the Lightwave hierarchy, showing last known states, retrying in %s seconds", retry_delay)
+        await asyncio.sleep(retry_delay)
+        retry_delay = min(2 * retry_delay, REFRESH_MAX_RETRY_DELAY)
+    timings["live_hierarchy"] = time.monotonic() - started
+    await store.async_save(serialize_hierarchy(link))
+
+    if hierarchy_signature(link) != signature:
+        _LOGGER.info("Lightwave hierarchy has changed since the last start, reloading")
+        hass.async_create_task(hass.config_entries.async_reload(config_entry.entry_id))
+        return
+
+    router = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_ROUTER]
+    router.invalidate()
+    changed = router.dispatch_changes(previous_states)
+    _LOGGER.info("Live Lightwave hierarchy received %.2f seconds after startup, %s features changed", timings["live_hierarchy"], changed)
+
+async def async_unload_entry(hass, config_entry):
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    if LIGHTWAVE_WEBHOOK in entry_data:
+        if entry_data[LIGHTWAVE_WEBHOOK] is not None:
+            webhook_id = entry_data[LIGHTWAVE_WEBHOOKID]
+            hass.components.webhook.async_unregister(webhook_id)
+            hass.data.get(LIGHTWAVE_WEBHOOK_ENTRIES, {}).pop(webhook_id, None)
+    if LIGHTWAVE_COALESCER in entry_data:
+        entry_data[LIGHTWAVE_COALESCER].async_cancel()
+    if LIGHTWAVE_OPTIMISTIC in entry_data:
+        entry_data[LIGHTWAVE_OPTIMISTIC].async_cancel()
+    if LIGHTWAVE_STATISTICS in entry_data:
+        entry_data[LIGHTWAVE_STATISTICS].async_stop()
+    if LIGHTWAVE_RESYNC in entry_data:
+        entry_data[LIGHTWAVE_RESYNC].async_cancel()
+    if LIGHTWAVE_RECONCILER in entry_data:
+        entry_data[LIGHTWAVE_RECONCILER].async_stop()
+
+    timings = entry_data.get(LIGHTWAVE_TIMINGS, {})
+    started = time.monotonic()
+
+    async def async_forward_unload(platform):
+        start = time.monotonic()
+        result = await hass.config_entries.async_forward_entry_unload(config_entry, platform)
+        timings[f"unload_{platform}"] = time.monotonic() - start
+        return result
+
+    results = await asyncio.gather(*(async_forward_unload(platform) for platform in PLATFORMS))
+    _LOGGER.debug("Lightwave unload took %.2f seconds: %s", time.monotonic() - started, timings)
+
+    unloaded = all(results)
+    if unloaded:
+        hass.data[DOMAIN].pop(config_entry.entry_id)
+        if LIGHTWAVE_LINK2 in entry_data:
+            await async_close_link(entry_data[LIGHTWAVE_LINK2])
+    return unloaded
+
+async def async_close_link(link):
+    """Close the link's websocket, the task reading it and its HTTP session."""
+    ws = getattr(link, "_ws", None)
+    if ws is None:
+        # The public API only has a session
+        await link._session.close()
+        return
+    # Stop the reader first, it reconnects when it sees the websocket close
+    for task in tuple(getattr(ws, "background_tasks", ())):
+        task.cancel()
+    if ws._websocket is not None:
+        await ws._websocket.close()
+    session = getattr(ws, "_session", None)
+    if session is not None:
+        await session.close()
+
 async def async_remove_entry(hass, config_entry):
-    if LIGHTWAVE_WEBHOOK in hass.data[DOMAIN][config_entry.entry_id]:
-        if hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_WEBHOOK] is not None:
-            hass.components.webhook.async_unregister(hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_WEBHOOKID])
-    await hass.config_entries.async_forward_entry_unload(config_entry, "switch")
-    await hass.config_entries.async_forward_entry_unload(config_entry, "light")
-    await hass.config_entries.async_forward_entry_unload(config_entry, "climate")
-    await hass.config_entries.async_forward_entry_unload(config_entry, "cover")
-    await hass.config_entries.async_forward_entry_unload(config_entry, "binary_sensor")
-    await hass.config_entries.async_forward_entry_unload(config_entry, "sensor")
-    await hass.config_entries.async_forward_entry_unload(config_entry, "lock")
+    await get_store(hass, config_entry.entry_id).async_remove()
 
 async def reload_lw(hass, config_entry):
 
-    await async_remove_entry(hass, config_entry)
-    await async_setup_entry(hass, config_entry)
\ No newline at end of file
+    await hass.config_entries.async_reload(config_entry.entry_id)
\ No newline at end of file
@@ -0,0 +1,54 @@
+from .const import ATTRIBUTE_PROFILE_FULL, ATTRIBUTE_PROFILE_MINIMAL, ATTRIBUTE_PROFILE_NONE
+
+# Frequently reported values, left out of the minimal profile as they make the
+# recorder store a new row of attributes on nearly every state write
+VOLATILE_FEATURES = frozenset({
+    "power", "energy", "current", "voltage", "rssi", "temperature", "humidity", "lightLevel",
+    "dawnTime", "duskTime", "time", "date", "year", "month", "day", "weekday", "valveLevel",
+})
+
+
+def build_attributes(feature_set, profile=ATTRIBUTE_PROFILE_FULL):
+    """Return the lwrf_* attributes of a featureset for the given profile."""
+    if profile == ATTRIBUTE_PROFILE_NONE:
+        return None
+
+    attribs = {}
+    for featurename, feature in feature_set.features.items():
+        if profile == ATTRIBUTE_PROFILE_MINIMAL and featurename in VOLATILE_FEATURES:
+            continue
+        attribs['lwrf_' + featurename] = feature.state
+    return attribs
+
+
+class LWRF2AttributeCache:
+    """Per-featureset lwrf_* attribute snapshots shared by all entities of the featureset.
+
+    A snapshot is rebuilt only when the router reports that a feature of the
+    featureset has changed since it was built.
+    """
+
+    def __init__(self, link, router, profile=ATTRIBUTE_PROFILE_FULL):
+        self._lwlink = link
+        self._router = router
+        self._profile = profile
+        self._snapshots = {}
+
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, featureset_id):
+        """Return the attribute snapshot of a featureset, the result must not be modified."""
+        if self._profile == ATTRIBUTE_PROFILE_NONE:
+            return None
+
+        version = self._router.version(featureset_id)
+        snapshot = self._snapshots.get(featureset_id)
+        if snapshot is not None and snapshot[0] == version:
+            self.hits += 1
+            return snapshot[1]
+
+        attribs = build_attributes(self._lwlink.featuresets[featureset_id], self._profile)
+        self._snapshots[featureset_id] = (version, attribs)
+        self.builds += 1
+        return attribs
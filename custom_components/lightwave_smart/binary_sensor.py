@@ -1,5 +1,5 @@
 import logging
-from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, CONF_HOMEKIT, DOMAIN
+from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_DISCOVERY, CONF_HOMEKIT, DOMAIN
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorEntityDescription
 # Device Classes
 try:
@@ -14,7 +14,11 @@ from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers import entity_registry as er
 from .utils import (
     make_device_info,
-    get_extra_state_attributes
+    get_hub_id,
+    get_extra_state_attributes,
+    async_register_feature_callback,
+    async_schedule_state_write,
+    LWRF2FeatureHandles
 )
 
 DEPENDENCIES = ['lightwave_smart']
@@ -48,15 +52,14 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     sensors = []
     link = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2]
+    discovery = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY]
 
     homekit = config_entry.options.get(CONF_HOMEKIT, False)
 
-    for featureset_id, featureset in link.featuresets.items():
-        for description in SENSORS:
-            if featureset.has_feature(description.key):
-                try:
-                    sensors.append(LWRF2BinarySensor(featureset.name, featureset_id, link, description, homekit))
-                except Exception as e: _LOGGER.exception("Could not add LWRF2BinarySensor")
+    for featureset_id, name, description in discovery.pairs(SENSORS):
+        try:
+            sensors.append(LWRF2BinarySensor(name, featureset_id, link, description, homekit))
+        except Exception as e: _LOGGER.exception("Could not add LWRF2BinarySensor")
     
     hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_ENTITIES].extend(sensors)
     async_add_entities(sensors)
@@ -72,10 +75,11 @@ class LWRF2BinarySensor(BinarySensorEntity):
         self._featureset_id = featureset_id
         self._lwlink = link
 
-        for hub_featureset_id, hubname in link.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
 
         self.entity_description = description
+        self._features = (self.entity_description.key,)
+        self._handles = LWRF2FeatureHandles(self._lwlink, self._featureset_id, self._features)
 
         self._homekit = homekit
 
@@ -87,13 +91,10 @@ class LWRF2BinarySensor(BinarySensorEntity):
         self._attr_unique_id = f"{self._featureset_id}_{self.entity_description.key}"
         self._attr_device_info = make_device_info(self, name)
 
-        self._state = \
-            self._lwlink.featuresets[self._featureset_id].features[self.entity_description.key].state
-
 
     async def async_added_to_hass(self):
         """Subscribe to events."""
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
+        await async_register_feature_callback(self, self._features)
         registry = er.async_get(self.hass)
         entity_entry = registry.async_get(self.entity_id)
         if self._homekit:
@@ -108,17 +109,12 @@ class LWRF2BinarySensor(BinarySensorEntity):
     @callback
     def async_update_callback(self, **kwargs):
         """Update the component's state."""
-        self.async_schedule_update_ha_state(True)
-
-    async def async_update(self):
-        """Update state"""
-        self._state = \
-            self._lwlink.featuresets[self._featureset_id].features[self.entity_description.key].state
+        async_schedule_state_write(self)
 
     @property
     def is_on(self):
-        """Lightwave switch is on state."""
-        return self._state
+        """Lightwave switch is on state, read from the feature."""
+        return self._handles.get()[0].state
 
     @property
     def extra_state_attributes(self):
@@ -1,11 +1,12 @@
 import logging
-from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, DOMAIN
+from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_DISCOVERY, DOMAIN
 from homeassistant.const import ATTR_TEMPERATURE, STATE_OFF
 from homeassistant.components.climate import (
     ClimateEntity, 
     ClimateEntityDescription, 
     ClimateEntityFeature
 )
+from homeassistant.components.climate.const import ATTR_HVAC_MODE
 try:
     from homeassistant.components.climate.const import ClimateEntityFeature, HVACAction, HVACMode
     CURRENT_HVAC_HEAT = HVACAction.HEATING
@@ -37,7 +38,12 @@ except ImportError:
 from homeassistant.core import callback
 from .utils import (
     make_device_info,
-    get_extra_state_attributes
+    get_hub_id,
+    get_extra_state_attributes,
+    async_register_feature_callback,
+    async_schedule_state_write,
+    async_write_entity_features,
+    LWRF2FeatureHandles
 )
 
 DEPENDENCIES = ['lightwave_smart']
@@ -50,14 +56,19 @@ CLIMATE = ClimateEntityDescription(
     name="Thermostat",
 )   
 
+CLIMATE_FEATURES = ("valveLevel", "callForHeat", "heatState", "temperature", "targetTemperature", "humidity", "targetHumidity")
+# Order of the Feature objects LWRF2Climate reads, see LWRF2FeatureHandles
+CLIMATE_HANDLES = ("temperature", "targetTemperature", "heatState", "valveLevel", "callForHeat", "humidity", "targetHumidity")
+
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Find and return Lightwave thermostats."""
 
     climates = []
     link = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2]
+    discovery = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY]
 
-    for featureset_id, name in link.get_climates():
+    for featureset_id, name in discovery.get("climate"):
         try:
             climates.append(LWRF2Climate(name, featureset_id, link))
         except Exception as e: _LOGGER.exception("Could not add LWRF2Climate")
@@ -78,10 +89,10 @@ class LWRF2Climate(ClimateEntity):
         self._featureset_id = featureset_id
         self._lwlink = link
 
-        for hub_featureset_id, hubname in self._lwlink.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
 
         self.entity_description = CLIMATE
+        self._features = CLIMATE_FEATURES
 
         self._gen2 = self._lwlink.featuresets[self._featureset_id].is_gen2()
         self._attr_assumed_state = not self._gen2
@@ -91,7 +102,10 @@ class LWRF2Climate(ClimateEntity):
 
 
         self._trv = self._lwlink.featuresets[self._featureset_id].is_trv()
-        self._has_humidity = 'targetHumidity' in self._lwlink.featuresets[self._featureset_id].features.keys()
+        self._handles = LWRF2FeatureHandles(self._lwlink, self._featureset_id, CLIMATE_HANDLES)
+        temperature, target_temperature, heat_state, valve_level, call_for_heat, humidity, target_humidity = self._handles.get()
+
+        self._has_humidity = target_humidity is not None
         if self._has_humidity:
             self._support_flags = SUPPORT_TARGET_TEMPERATURE | SUPPORT_TARGET_HUMIDITY
         elif self._trv:
@@ -99,45 +113,37 @@ class LWRF2Climate(ClimateEntity):
         else:
             self._support_flags = SUPPORT_TARGET_TEMPERATURE
         
-        if 'heatState' in self._lwlink.featuresets[self._featureset_id].features.keys():
-            self._thermostat = False
-        else:
-            self._thermostat = True
+        self._thermostat = heat_state is None
             
         self._valve_level = 100
-        if 'valveLevel' in self._lwlink.featuresets[self._featureset_id].features.keys():
-            self._valve_level = self._lwlink.featuresets[self._featureset_id].features["valveLevel"].state
+        if valve_level is not None:
+            self._valve_level = valve_level.state
         elif self._thermostat:
-            if "callForHeat" in self._lwlink.featuresets[self._featureset_id].features:
-                if self._lwlink.featuresets[self._featureset_id].features["callForHeat"].state is None:
+            if call_for_heat is not None:
+                if call_for_heat.state is None:
                     self._valve_level = 0
                 else:    
-                    self._valve_level = \
-                        self._lwlink.featuresets[self._featureset_id].features["callForHeat"].state * 100
+                    self._valve_level = call_for_heat.state * 100
 
         if self._thermostat:
             self._onoff = 1
         else:
-            self._onoff = \
-                self._lwlink.featuresets[self._featureset_id].features["heatState"].state
+            self._onoff = heat_state.state
 
-        if self._lwlink.featuresets[self._featureset_id].features["temperature"].state is None:
+        if temperature.state is None:
             self._temperature = None
         else:
-            self._temperature = \
-                self._lwlink.featuresets[self._featureset_id].features["temperature"].state / 10
+            self._temperature = temperature.state / 10
 
-        self._target_temperature = self._lwlink.featuresets[self._featureset_id].features["targetTemperature"].state
+        self._target_temperature = target_temperature.state
         self._target_temperature = self._target_temperature / 10 if self._target_temperature is not None else None
                 
         self._last_tt = self._target_temperature #Used to store the target temperature to revert to after boosting
         self._temperature_scale = TEMP_CELSIUS
 
         if self._has_humidity:
-            self._humidity = \
-                self._lwlink.featuresets[self._featureset_id].features["humidity"].state
-            self._target_humidity = \
-                self._lwlink.featuresets[self._featureset_id].features["targetHumidity"].state
+            self._humidity = humidity.state
+            self._target_humidity = target_humidity.state
 
         if self._valve_level == 100 and (self._target_temperature is None or self._target_temperature < 40):
             self._preset_mode = "Auto"
@@ -157,12 +163,12 @@ class LWRF2Climate(ClimateEntity):
 
     async def async_added_to_hass(self):
         """Subscribe to events."""
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
+        await async_register_feature_callback(self, self._features)
 
     @callback
     def async_update_callback(self, **kwargs):
         """Update the component's state."""
-        self.async_schedule_update_ha_state(True)
+        async_schedule_state_write(self)
 
     @property
     def supported_features(self):
@@ -230,45 +236,43 @@ class LWRF2Climate(ClimateEntity):
             self._target_temperature = kwargs[ATTR_TEMPERATURE]
             self._last_tt = self._target_temperature
 
-        await self._lwlink.async_set_temperature_by_featureset_id(
-            self._featureset_id, self._target_temperature)
+        writes = [("targetTemperature", int(self._target_temperature * 10))]
+        # A temperature and mode set together go out in one request
+        if ATTR_HVAC_MODE in kwargs and not self._thermostat:
+            writes.append(("heatState", 0 if kwargs[ATTR_HVAC_MODE] == HVAC_MODE_OFF else 1))
+        await async_write_entity_features(self, writes)
 
     async def async_set_humidity(self, humidity):
-        feature_id = self._lwlink.featuresets[self._featureset_id].features['targetHumidity'].id
-        await self._lwlink.async_write_feature(feature_id, humidity)
+        await async_write_entity_features(self, [("targetHumidity", humidity)])
 
     async def async_set_hvac_mode(self, hvac_mode):
-        feature_id = self._lwlink.featuresets[self._featureset_id].features['heatState'].id
         _LOGGER.debug("Received mode set request: %s ", hvac_mode)
-        _LOGGER.debug("Setting feature ID: %s ", feature_id)
         if hvac_mode == HVAC_MODE_OFF:
-            await self._lwlink.async_write_feature(feature_id, 0)
+            await async_write_entity_features(self, [("heatState", 0)])
         else:
-            await self._lwlink.async_write_feature(feature_id, 1)
+            await async_write_entity_features(self, [("heatState", 1)])
 
     async def async_update(self):
         """Update state"""
+        temperature, target_temperature, heat_state, valve_level, call_for_heat, humidity, target_humidity = self._handles.get()
         self._valve_level = 100
-        if 'valveLevel' in self._lwlink.featuresets[self._featureset_id].features.keys():
-            self._valve_level = self._lwlink.featuresets[self._featureset_id].features["valveLevel"].state
+        if valve_level is not None:
+            self._valve_level = valve_level.state
         elif self._thermostat:
-            if "callForHeat" in self._lwlink.featuresets[self._featureset_id].features:
-                if self._lwlink.featuresets[self._featureset_id].features["callForHeat"].state is None:
+            if call_for_heat is not None:
+                if call_for_heat.state is None:
                     self._valve_level = 0
                 else:    
-                    self._valve_level = \
-                        self._lwlink.featuresets[self._featureset_id].features["callForHeat"].state * 100
+                    self._valve_level = call_for_heat.state * 100
 
         if self._thermostat:
             self._onoff = 1
         else:
-            self._onoff = \
-                self._lwlink.featuresets[self._featureset_id].features["heatState"].state
+            self._onoff = heat_state.state
                     
-        self._temperature = \
-            self._lwlink.featuresets[self._featureset_id].features["temperature"].state / 10
+        self._temperature = temperature.state / 10
             
-        self._target_temperature = self._lwlink.featuresets[self._featureset_id].features["targetTemperature"].state
+        self._target_temperature = target_temperature.state
         self._target_temperature = self._target_temperature / 10 if self._target_temperature is not None else None
         
         if self._valve_level == 100 and (self._target_temperature is None or self._target_temperature < 40):
@@ -276,10 +280,8 @@ class LWRF2Climate(ClimateEntity):
             self._last_tt = self._target_temperature
 
         if self._has_humidity:
-            self._humidity = \
-                self._lwlink.featuresets[self._featureset_id].features["humidity"].state
-            self._target_humidity = \
-                self._lwlink.featuresets[self._featureset_id].features["targetHumidity"].state
+            self._humidity = humidity.state
+            self._target_humidity = target_humidity.state
 
         elif self._valve_level == 100:
             self._preset_mode = "100%"
@@ -303,13 +305,10 @@ class LWRF2Climate(ClimateEntity):
         """Set preset mode."""
         if preset_mode == "Auto":
             self._target_temperature = self._last_tt
-            await self._lwlink.async_set_temperature_by_featureset_id(
-                self._featureset_id, self._target_temperature)
+            await async_write_entity_features(self, [("targetTemperature", int(self._target_temperature * 10))])
         else:
-            feature_id = self._lwlink.featuresets[self._featureset_id].features['valveLevel'].id
             _LOGGER.debug("Received preset set request: %s ", preset_mode)
-            _LOGGER.debug("Setting feature ID: %s ", feature_id)
-            await self._lwlink.async_write_feature(feature_id, PRESET_NAMES[preset_mode])
+            await async_write_entity_features(self, [("valveLevel", PRESET_NAMES[preset_mode])])
 
     @property
     def preset_modes(self):
@@ -0,0 +1,60 @@
+import logging
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LWRF2StateCoalescer:
+    """Collect entities needing a state write and flush them together.
+
+    During a burst of feature events (reconnects, update_states, webhooks) an
+    entity may be marked dirty many times, it is only written once per flush.
+    A window of 0 flushes on the next event loop iteration.
+    """
+
+    def __init__(self, hass, window=0):
+        self._hass = hass
+        self._window = window
+        self._dirty = {}
+        self._handle = None
+
+        self.merged = 0
+        self.emitted = 0
+
+    @callback
+    def async_schedule(self, entity, force_refresh=True):
+        """Mark an entity as needing a state write."""
+        if entity in self._dirty:
+            self._dirty[entity] = self._dirty[entity] or force_refresh
+            self.merged += 1
+            return
+
+        self._dirty[entity] = force_refresh
+        if self._handle is None:
+            if self._window > 0:
+                self._handle = self._hass.loop.call_later(self._window, self._async_flush)
+            else:
+                self._handle = self._hass.loop.call_soon(self._async_flush)
+
+    @callback
+    def _async_flush(self):
+        self._handle = None
+        dirty, self._dirty = self._dirty, {}
+        for entity, force_refresh in dirty.items():
+            if entity.hass is None:
+                continue
+            entity.async_schedule_update_ha_state(force_refresh)
+            self.emitted += 1
+        _LOGGER.debug("Flushed %s state writes (merged %s, emitted %s in total)", len(dirty), self.merged, self.emitted)
+
+    @callback
+    def async_cancel(self):
+        """Drop any pending writes."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._dirty = {}
+
+    def stats(self):
+        """Return the merged and emitted write counters."""
+        return {"merged": self.merged, "emitted": self.emitted, "pending": len(self._dirty)}
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import time
+from homeassistant.exceptions import HomeAssistantError
+from lightwave_smart import lightwave_smart
+from .const import BULK_CHUNK_SIZE, BULK_MAX_CONCURRENCY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_write_features(link, writes):
+    """Write several (feature_id, value) pairs as one request.
+
+    The websocket API accepts many items per feature write message. The public
+    API has one REST call per feature, so its writes are sent concurrently.
+    Returns whether each write was acknowledged, in the order of writes.
+    """
+    writes = list(writes)
+    if not writes:
+        return []
+    if isinstance(link, lightwave_smart.LWLink2Public):
+        return list(await asyncio.gather(*(async_write_public(link, feature_id, value) for feature_id, value in writes)))
+
+    _LOGGER.debug("Feature write: %s", writes)
+    message = lightwave_smart._LWRFWebsocketMessage("feature", "write")
+    item_ids = [
+        message.additem(lightwave_smart._LWRFWebsocketMessageItem({"featureId": feature_id, "value": value}))
+        for feature_id, value in writes
+    ]
+    responses = await link._ws._async_sendmessage(message) or []
+    acknowledged = {response["itemId"]: response.get("success", False) for response in responses}
+    return [acknowledged.get(item_id, False) for item_id in item_ids]
+
+
+async def async_write_public(link, feature_id, value):
+    """Write one feature through the public API, returns whether it was accepted.
+
+    The link's own write drops the response, a failed request returns False
+    or an error body ({"message": ...}) instead of the feature's value.
+    """
+    try:
+        response = await link._async_postrequest("feature/" + feature_id, {"value": value})
+    except Exception as ex:
+        _LOGGER.warning("Public API write of %s failed: %s", feature_id, ex)
+        return False
+    if not response or (isinstance(response, dict) and ("message" in response or "error" in response)):
+        _LOGGER.warning("Public API write of %s was not accepted: %s", feature_id, response)
+        return False
+    return True
+
+
+async def async_bulk_write(link, targets, chunk_size=BULK_CHUNK_SIZE, max_concurrency=BULK_MAX_CONCURRENCY, metrics=None):
+    """Write the (feature_id, value) pairs of many targets in batches with bounded concurrency.
+
+    Targets are packed into requests of up to chunk_size writes, a target is
+    never split across requests, and at most max_concurrency requests are in
+    flight. Returns target -> None on success, or an error message.
+    Each request's round trip is recorded with metrics, if given.
+    """
+    if isinstance(link, lightwave_smart.LWLink2Public):
+        # One REST call per feature, let the semaphore bound them per target
+        chunk_size = 1
+
+    chunks = [[]]
+    size = 0
+    for target, writes in targets.items():
+        if chunks[-1] and size + len(writes) > chunk_size:
+            chunks.append([])
+            size = 0
+        chunks[-1].append((target, writes))
+        size += len(writes)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = {}
+
+    async def async_send(chunk):
+        async with semaphore:
+            try:
+                started = time.monotonic()
+                acknowledged = await async_write_features(link, [write for target, writes in chunk for write in writes])
+                if metrics is not None:
+                    metrics.record_command(time.monotonic() - started)
+            except Exception as ex:
+                _LOGGER.warning("Bulk write failed: %s", ex)
+                for target, writes in chunk:
+                    results[target] = str(ex) or type(ex).__name__
+                return
+        start = 0
+        for target, writes in chunk:
+            success = all(acknowledged[start:start + len(writes)])
+            results[target] = None if success else "Write not acknowledged"
+            start += len(writes)
+
+    await asyncio.gather(*(async_send(chunk) for chunk in chunks if chunk))
+    return results
+
+
+async def async_read_features(link, feature_ids):
+    """Read several features as one request, returns feature_id -> value for every successful read.
+
+    Nothing is stored in the link's features, comparing and storing is up to the caller.
+    """
+    feature_ids = list(feature_ids)
+    if not feature_ids:
+        return {}
+    if isinstance(link, lightwave_smart.LWLink2Public):
+        values = await link._async_postrequest("features/read", {"features": [{"featureId": feature_id} for feature_id in feature_ids]})
+        return {feature_id: values[feature_id] for feature_id in feature_ids if feature_id in (values or {})}
+
+    message = lightwave_smart._LWRFWebsocketMessage("feature", "read")
+    item_ids = {
+        message.additem(lightwave_smart._LWRFWebsocketMessageItem({"featureId": feature_id})): feature_id
+        for feature_id in feature_ids
+    }
+    responses = await link._ws._async_sendmessage(message) or []
+    return {
+        item_ids[response["itemId"]]: response["payload"]["value"]
+        for response in responses if response.get("success") and response["itemId"] in item_ids
+    }
+
+
+async def async_bulk_read(link, feature_ids, chunk_size=BULK_CHUNK_SIZE, max_concurrency=BULK_MAX_CONCURRENCY):
+    """Read many features in requests of up to chunk_size items with at most max_concurrency in flight.
+
+    Returns feature_id -> value, features whose request failed are left out.
+    """
+    feature_ids = list(feature_ids)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    values = {}
+
+    async def async_read(chunk):
+        async with semaphore:
+            try:
+                values.update(await async_read_features(link, chunk))
+            except Exception as ex:
+                _LOGGER.warning("Bulk read failed: %s", ex)
+
+    await asyncio.gather(*(
+        async_read(feature_ids[start:start + chunk_size]) for start in range(0, len(feature_ids), chunk_size)))
+    return values
+
+
+class LWRF2CommandQueue:
+    """Serialise outgoing writes per featureset, keeping only the newest value per feature.
+
+    While a write for a featureset is in flight, further writes are merged into
+    one pending batch where a later value replaces an earlier one for the same
+    feature. The batch is sent when the in-flight write completes, so a stream
+    of slider moves costs at most one extra round trip instead of one each.
+    A write the link does not acknowledge raises HomeAssistantError, for every
+    caller whose values were in it.
+    """
+
+    def __init__(self, hass, link, metrics=None):
+        self._hass = hass
+        self._lwlink = link
+        self._metrics = metrics
+        self._busy = set()
+        self._pending = {}
+        self._futures = {}
+
+        self.sent = 0
+        self.superseded = 0
+        self.failed = 0
+
+    async def async_write(self, key, writes):
+        """Write (feature_id, value) pairs, returns once they have been acknowledged."""
+        if key not in self._busy:
+            self._busy.add(key)
+            try:
+                await self._async_send(writes)
+            finally:
+                self._async_next(key)
+            return
+
+        pending = self._pending.setdefault(key, {})
+        for feature_id, value in writes:
+            if feature_id in pending:
+                self.superseded += 1
+            pending[feature_id] = value
+        future = self._futures.get(key)
+        if future is None:
+            future = self._futures[key] = self._hass.loop.create_future()
+        await future
+
+    async def _async_send(self, writes):
+        writes = list(writes)
+        started = time.monotonic()
+        acknowledged = await async_write_features(self._lwlink, writes)
+        if not all(acknowledged):
+            self.failed += 1
+            failed = [feature_id for (feature_id, value), success in zip(writes, acknowledged) if not success]
+            raise HomeAssistantError(f"Lightwave did not acknowledge the write of {', '.join(failed)}")
+        self.sent += 1
+        if self._metrics is not None:
+            self._metrics.record_command(time.monotonic() - started)
+
+    def _async_next(self, key):
+        if key in self._pending:
+            self._hass.async_create_task(self._async_drain(key))
+        else:
+            self._busy.discard(key)
+
+    async def _async_drain(self, key):
+        pending = self._pending.pop(key)
+        future = self._futures.pop(key)
+        try:
+            await self._async_send(pending.items())
+        except Exception as ex:
+            if not future.done():
+                future.set_exception(ex)
+        else:
+            if not future.done():
+                future.set_result(None)
+        finally:
+            self._async_next(key)
+
+    def stats(self):
+        """Return the sent, superseded and failed write counters."""
+        return {"sent": self.sent, "superseded": self.superseded, "failed": self.failed, "pending": len(self._pending)}
@@ -3,7 +3,13 @@ from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.const import (CONF_USERNAME, CONF_PASSWORD)
-from .const import DOMAIN, CONF_PUBLICAPI, CONF_HOMEKIT
+from .const import DOMAIN, CONF_PUBLICAPI, CONF_HOMEKIT, CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW, \
+    CONF_EVENT_SENSOR_INTERVAL, DEFAULT_EVENT_SENSOR_INTERVAL, \
+    CONF_DEADBAND_POWER, CONF_DEADBAND_CURRENT, CONF_DEADBAND_VOLTAGE, CONF_DEADBAND_RSSI, CONF_DEADBAND_RELATIVE, \
+    CONF_MIN_REPORT_INTERVAL, CONF_REPORT_HEARTBEAT, DEFAULT_DEADBANDS, DEFAULT_DEADBAND_RELATIVE, \
+    DEFAULT_MIN_REPORT_INTERVAL, DEFAULT_REPORT_HEARTBEAT, CONF_ENERGY_STATISTICS, \
+    CONF_RECONCILE_PERIOD, CONF_RECONCILE_BUDGET, DEFAULT_RECONCILE_PERIOD, DEFAULT_RECONCILE_BUDGET, \
+    CONF_ATTRIBUTE_PROFILE, ATTRIBUTE_PROFILE_FULL, ATTRIBUTE_PROFILES, CONF_SERVER_URL
 import voluptuous as vol
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,13 +59,41 @@ class lightwave_smartOptionsFlowHandler(config_entries.OptionsFlow):
         else:
             options = {
                 CONF_PUBLICAPI: False,
-                CONF_HOMEKIT: False
+                CONF_HOMEKIT: False,
+                CONF_WRITE_WINDOW: DEFAULT_WRITE_WINDOW,
+                CONF_EVENT_SENSOR_INTERVAL: DEFAULT_EVENT_SENSOR_INTERVAL,
+                CONF_DEADBAND_POWER: DEFAULT_DEADBANDS["power"],
+                CONF_DEADBAND_CURRENT: DEFAULT_DEADBANDS["current"],
+                CONF_DEADBAND_VOLTAGE: DEFAULT_DEADBANDS["voltage"],
+                CONF_DEADBAND_RSSI: DEFAULT_DEADBANDS["rssi"],
+                CONF_DEADBAND_RELATIVE: DEFAULT_DEADBAND_RELATIVE,
+                CONF_MIN_REPORT_INTERVAL: DEFAULT_MIN_REPORT_INTERVAL,
+                CONF_REPORT_HEARTBEAT: DEFAULT_REPORT_HEARTBEAT,
+                CONF_ENERGY_STATISTICS: False,
+                CONF_RECONCILE_PERIOD: DEFAULT_RECONCILE_PERIOD,
+                CONF_RECONCILE_BUDGET: DEFAULT_RECONCILE_BUDGET,
+                CONF_ATTRIBUTE_PROFILE: ATTRIBUTE_PROFILE_FULL,
+                CONF_SERVER_URL: ""
             }
             _LOGGER.debug("Creating options form using default options")
 
         return self.async_show_form(
             step_id="user", data_schema=vol.Schema({
                 vol.Optional(CONF_PUBLICAPI, default=options.get(CONF_PUBLICAPI)): bool,
-                vol.Optional(CONF_HOMEKIT, default=options.get(CONF_HOMEKIT)): bool
+                vol.Optional(CONF_HOMEKIT, default=options.get(CONF_HOMEKIT)): bool,
+                vol.Optional(CONF_WRITE_WINDOW, default=options.get(CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW)): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Optional(CONF_EVENT_SENSOR_INTERVAL, default=options.get(CONF_EVENT_SENSOR_INTERVAL, DEFAULT_EVENT_SENSOR_INTERVAL)): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(CONF_DEADBAND_POWER, default=options.get(CONF_DEADBAND_POWER, DEFAULT_DEADBANDS["power"])): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_DEADBAND_CURRENT, default=options.get(CONF_DEADBAND_CURRENT, DEFAULT_DEADBANDS["current"])): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_DEADBAND_VOLTAGE, default=options.get(CONF_DEADBAND_VOLTAGE, DEFAULT_DEADBANDS["voltage"])): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_DEADBAND_RSSI, default=options.get(CONF_DEADBAND_RSSI, DEFAULT_DEADBANDS["rssi"])): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_DEADBAND_RELATIVE, default=options.get(CONF_DEADBAND_RELATIVE, DEFAULT_DEADBAND_RELATIVE)): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                vol.Optional(CONF_MIN_REPORT_INTERVAL, default=options.get(CONF_MIN_REPORT_INTERVAL, DEFAULT_MIN_REPORT_INTERVAL)): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(CONF_REPORT_HEARTBEAT, default=options.get(CONF_REPORT_HEARTBEAT, DEFAULT_REPORT_HEARTBEAT)): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                vol.Optional(CONF_ENERGY_STATISTICS, default=options.get(CONF_ENERGY_STATISTICS, False)): bool,
+                vol.Optional(CONF_RECONCILE_PERIOD, default=options.get(CONF_RECONCILE_PERIOD, DEFAULT_RECONCILE_PERIOD)): vol.All(vol.Coerce(int), vol.Range(min=0, max=10080)),
+                vol.Optional(CONF_RECONCILE_BUDGET, default=options.get(CONF_RECONCILE_BUDGET, DEFAULT_RECONCILE_BUDGET)): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                vol.Optional(CONF_ATTRIBUTE_PROFILE, default=options.get(CONF_ATTRIBUTE_PROFILE, ATTRIBUTE_PROFILE_FULL)): vol.In(ATTRIBUTE_PROFILES),
+                vol.Optional(CONF_SERVER_URL, default=options.get(CONF_SERVER_URL, "")): str
             })
         )
\ No newline at end of file
@@ -2,15 +2,64 @@ DOMAIN = "lightwave_smart"
 CONF_PUBLICAPI = 'lightwave_publicapi'
 CONF_FORCESEND = 'lightwave_alwayssend'
 CONF_HOMEKIT = 'lightwave_homekit'
+CONF_WRITE_WINDOW = 'lightwave_write_window'
+DEFAULT_WRITE_WINDOW = 0
+CONF_EVENT_SENSOR_INTERVAL = 'lightwave_event_sensor_interval'
+DEFAULT_EVENT_SENSOR_INTERVAL = 60
+CONF_DEADBAND_POWER = 'lightwave_deadband_power'
+CONF_DEADBAND_CURRENT = 'lightwave_deadband_current'
+CONF_DEADBAND_VOLTAGE = 'lightwave_deadband_voltage'
+CONF_DEADBAND_RSSI = 'lightwave_deadband_rssi'
+CONF_DEADBAND_RELATIVE = 'lightwave_deadband_relative'
+CONF_MIN_REPORT_INTERVAL = 'lightwave_min_report_interval'
+CONF_REPORT_HEARTBEAT = 'lightwave_report_heartbeat'
+DEFAULT_DEADBANDS = {"power": 0, "current": 0, "voltage": 0, "rssi": 0}
+DEFAULT_DEADBAND_RELATIVE = 0
+DEFAULT_MIN_REPORT_INTERVAL = 0
+DEFAULT_REPORT_HEARTBEAT = 900
+CONF_ENERGY_STATISTICS = 'lightwave_energy_statistics'
+CONF_RECONCILE_PERIOD = 'lightwave_reconcile_period'
+CONF_RECONCILE_BUDGET = 'lightwave_reconcile_budget'
+DEFAULT_RECONCILE_PERIOD = 0
+DEFAULT_RECONCILE_BUDGET = 6
+RECONCILE_JITTER = 0.2
+CONFIRM_TIMEOUT = 10
+REFRESH_RETRY_DELAY = 30
+REFRESH_MAX_RETRY_DELAY = 600
+METRICS_INTERVAL = 30
+BULK_CHUNK_SIZE = 20
+BULK_MAX_CONCURRENCY = 4
+RESYNC_MAX_CONCURRENCY = 4
+# Features whose events are presses rather than state, a value read back is never replayed as an event
+MOMENTARY_FEATURES = ('buttonPress', 'uiButton', 'uiButtonPair')
+CONF_ATTRIBUTE_PROFILE = 'lightwave_attribute_profile'
+CONF_SERVER_URL = 'lightwave_server_url'
+ATTRIBUTE_PROFILE_FULL = 'full'
+ATTRIBUTE_PROFILE_MINIMAL = 'minimal'
+ATTRIBUTE_PROFILE_NONE = 'none'
+ATTRIBUTE_PROFILES = [ATTRIBUTE_PROFILE_FULL, ATTRIBUTE_PROFILE_MINIMAL, ATTRIBUTE_PROFILE_NONE]
 LIGHTWAVE_LINK2 = 'lightwave_link2'
 LIGHTWAVE_LINKID = 'lightwave_linkid'
 LIGHTWAVE_ENTITIES = "lightwave_entities"
+LIGHTWAVE_ROUTER = 'lightwave_router'
+LIGHTWAVE_COALESCER = 'lightwave_coalescer'
+LIGHTWAVE_COMMANDS = 'lightwave_commands'
+LIGHTWAVE_OPTIMISTIC = 'lightwave_optimistic'
+LIGHTWAVE_ATTRIBUTES = 'lightwave_attributes'
+LIGHTWAVE_TIMINGS = 'lightwave_timings'
+LIGHTWAVE_METRICS = 'lightwave_metrics'
+LIGHTWAVE_STATISTICS = 'lightwave_statistics'
+LIGHTWAVE_RESYNC = 'lightwave_resync'
+LIGHTWAVE_RECONCILER = 'lightwave_reconciler'
+LIGHTWAVE_DISCOVERY = 'lightwave_discovery'
 LIGHTWAVE_WEBHOOK = 'lightwave_webhook'
 LIGHTWAVE_WEBHOOKID = 'lightwave_webhookid'
+LIGHTWAVE_WEBHOOK_ENTRIES = 'lightwave_webhook_entries'
 SERVICE_SETLEDRGB = 'set_led_rgb'
 SERVICE_SETLOCKED = 'lock'
 SERVICE_SETUNLOCKED = 'unlock'
 SERVICE_SETBRIGHTNESS = 'set_brightness'
 SERVICE_RECONNECT = 'reconnect'
 SERVICE_WHDELETE = 'whdelete'
-SERVICE_UPDATE = 'update_states'
\ No newline at end of file
+SERVICE_UPDATE = 'update_states'
+SERVICE_BULK_SET = 'bulk_set'
\ No newline at end of file
@@ -1,5 +1,5 @@
 import logging
-from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, DOMAIN
+from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_DISCOVERY, DOMAIN
 from homeassistant.components.cover import CoverEntity, CoverEntityDescription, CoverDeviceClass
 try:
     from homeassistant.components.cover import CoverEntityFeature
@@ -13,7 +13,10 @@ except ImportError:
 from homeassistant.core import callback
 from .utils import (
     make_device_info,
-    get_extra_state_attributes
+    get_hub_id,
+    get_extra_state_attributes,
+    async_register_feature_callback,
+    async_schedule_state_write
 )
 
 DEPENDENCIES = ['lightwave_smart']
@@ -31,8 +34,9 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     covers = []
     link = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2]
+    discovery = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY]
 
-    for featureset_id, name in link.get_covers():
+    for featureset_id, name in discovery.get("cover"):
         try:
             covers.append(LWRF2Cover(name, featureset_id, link))
         except Exception as e: _LOGGER.exception("Could not add LWRF2Cover")
@@ -53,10 +57,10 @@ class LWRF2Cover(CoverEntity):
         self._featureset_id = featureset_id
         self._lwlink = link
 
-        for hub_featureset_id, hubname in self._lwlink.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
 
         self.entity_description = COVER
+        self._features = ("threeWayRelay",)
 
         self._gen2 = self._lwlink.featuresets[self._featureset_id].is_gen2()
         self._attr_assumed_state = not self._gen2
@@ -70,12 +74,12 @@ class LWRF2Cover(CoverEntity):
 
     async def async_added_to_hass(self):
         """Subscribe to events."""
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
+        await async_register_feature_callback(self, self._features)
 
     @callback
     def async_update_callback(self, **kwargs):
         """Update the component's state."""
-        self.async_schedule_update_ha_state(True)
+        async_schedule_state_write(self)
 
     @property
     def supported_features(self):
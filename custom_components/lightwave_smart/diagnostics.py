@@ -0,0 +1,70 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
+from .const import DOMAIN, LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_ROUTER, LIGHTWAVE_COALESCER, LIGHTWAVE_COMMANDS, \
+    LIGHTWAVE_OPTIMISTIC, LIGHTWAVE_METRICS, LIGHTWAVE_TIMINGS, LIGHTWAVE_WEBHOOK, LIGHTWAVE_RECONCILER
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, LIGHTWAVE_WEBHOOK}
+
+
+def get_platform_counts(link, entities):
+    """Return platform -> entity, featureset and feature counts."""
+    featuresets = {}
+    counts = {}
+    for ent in entities:
+        platform = ent.platform.domain if ent.platform is not None else type(ent).__name__
+        counts.setdefault(platform, {"entities": 0})["entities"] += 1
+        featuresets.setdefault(platform, set()).add(ent._featureset_id)
+    for platform, featureset_ids in featuresets.items():
+        counts[platform]["featuresets"] = len(featureset_ids)
+        counts[platform]["features"] = sum(
+            len(link.featuresets[featureset_id].features) for featureset_id in featureset_ids
+            if featureset_id in link.featuresets
+        )
+    return counts
+
+
+def get_reporting_stats(entities):
+    """Return sensor key -> published and suppressed value counts, summed over the entry's sensors."""
+    stats = {}
+    for ent in entities:
+        report_filter = getattr(ent, "_report_filter", None)
+        if report_filter is None:
+            continue
+        totals = stats.setdefault(ent.entity_description.key, {"sensors": 0, "published": 0, "suppressed": 0})
+        totals["sensors"] += 1
+        for counter, value in report_filter.stats().items():
+            totals[counter] += value
+    return stats
+
+
+async def async_get_config_entry_diagnostics(hass, config_entry):
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    link = entry_data[LIGHTWAVE_LINK2]
+    router = entry_data[LIGHTWAVE_ROUTER]
+    metrics = entry_data[LIGHTWAVE_METRICS]
+    reconciler = entry_data.get(LIGHTWAVE_RECONCILER)
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(config_entry.data), TO_REDACT),
+            "options": async_redact_data(dict(config_entry.options), TO_REDACT),
+        },
+        "link": {
+            "type": type(link).__name__,
+            "featuresets": len(link.featuresets),
+            "features": sum(len(featureset.features) for featureset in link.featuresets.values()),
+            "hubs": len(link.get_hubs()),
+        },
+        "platforms": get_platform_counts(link, entry_data[LIGHTWAVE_ENTITIES]),
+        "timings": {phase: round(seconds, 3) for phase, seconds in entry_data[LIGHTWAVE_TIMINGS].items()},
+        "subscribers": router.subscriber_counts(),
+        "fan_out": router.fan_out(),
+        "metrics": metrics.snapshot(),
+        "command_latency_histogram": metrics.command_histogram(),
+        "coalescer": entry_data[LIGHTWAVE_COALESCER].stats(),
+        "commands": entry_data[LIGHTWAVE_COMMANDS].stats(),
+        "optimistic": entry_data[LIGHTWAVE_OPTIMISTIC].stats(),
+        "reporting": get_reporting_stats(entry_data[LIGHTWAVE_ENTITIES]),
+        "reconcile": reconciler.stats() if reconciler is not None else None,
+    }
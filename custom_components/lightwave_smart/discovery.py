@@ -0,0 +1,69 @@
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Featureset kinds: the feature a featureset needs to be of the kind, and the
+# LWRFFeatureSet predicate deciding it. Predicates only run when that feature is present.
+KIND_PREDICATES = {
+    "switch": ("switch", lambda featureset: featureset.is_switch()),
+    "socket": ("socketSetup", lambda featureset: featureset.is_outlet()),
+    "light": ("dimLevel", lambda featureset: featureset.is_light()),
+    "climate": ("targetTemperature", lambda featureset: featureset.is_climate()),
+    "cover": ("threeWayRelay", lambda featureset: featureset.is_cover()),
+    "hub": ("buttonPress", lambda featureset: featureset.is_hub()),
+    "uiButtonPair_producer": ("uiButtonPair", lambda featureset: featureset.is_uiButtonPair_producer()),
+    "uiButton_producer": ("uiButton", lambda featureset: featureset.is_uiButton_producer()),
+    "led": ("rgbColor", lambda featureset: featureset.has_led()),
+}
+
+KINDS_BY_FEATURE = {}
+for _kind, (_feature_type, _predicate) in KIND_PREDICATES.items():
+    KINDS_BY_FEATURE.setdefault(_feature_type, []).append((_kind, _predicate))
+
+
+class LWRF2Discovery:
+    """Index of a link's hierarchy, built in a single pass and shared by all platforms.
+
+    by_feature maps each feature type to the featuresets that have it, by_kind
+    maps each kind in KIND_PREDICATES to (featureset_id, name) pairs.
+    """
+
+    def __init__(self, link):
+        self.names = {}
+        self.primary_types = {}
+        self.by_feature = {}
+        self.by_kind = {kind: [] for kind in KIND_PREDICATES}
+        self._kind_sets = {kind: set() for kind in KIND_PREDICATES}
+
+        for featureset_id, featureset in link.featuresets.items():
+            self.names[featureset_id] = featureset.name
+            self.primary_types[featureset_id] = featureset.primary_feature_type
+            for feature_type in featureset.features:
+                self.by_feature.setdefault(feature_type, []).append(featureset_id)
+                for kind, predicate in KINDS_BY_FEATURE.get(feature_type, ()):
+                    if predicate(featureset):
+                        self.by_kind[kind].append((featureset_id, featureset.name))
+                        self._kind_sets[kind].add(featureset_id)
+
+        _LOGGER.debug("Discovered %s featuresets with %s feature types", len(self.names), len(self.by_feature))
+
+    def get(self, kind):
+        """Return (featureset_id, name) of every featureset of a kind."""
+        return self.by_kind[kind]
+
+    def is_kind(self, featureset_id, kind):
+        """Return whether a featureset is of a kind."""
+        return featureset_id in self._kind_sets[kind]
+
+    def with_feature(self, feature_type):
+        """Return (featureset_id, name) of every featureset that has a feature type."""
+        return [(featureset_id, self.names[featureset_id]) for featureset_id in self.by_feature.get(feature_type, ())]
+
+    def pairs(self, descriptions, featureset_filter=None):
+        """Return (featureset_id, name, description) for every featureset having a description's key."""
+        return [
+            (featureset_id, self.names[featureset_id], description)
+            for description in descriptions
+            for featureset_id in self.by_feature.get(description.key, ())
+            if featureset_filter is None or featureset_filter(featureset_id)
+        ]
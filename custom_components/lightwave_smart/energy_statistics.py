@@ -0,0 +1,170 @@
+import logging
+from datetime import timedelta
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util, slugify
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+ENERGY_UNIT = "Wh"
+POWER_UNIT = "W"
+
+
+def statistic_id(kind, featureset_id):
+    """Return the external statistic id of a featureset's energy or power, e.g. lightwave_smart:energy_5e3f_37_315_1."""
+    return f"{DOMAIN}:{kind}_{slugify(featureset_id)}"
+
+
+class LWRF2EnergyStatistics:
+    """Compute hourly energy and power statistics in memory and add them to the recorder in bulk.
+
+    Every featureset with an energy feature gets a slot in a set of parallel
+    lists, events only update their slot. Once an hour all slots are turned into
+    one row per statistic: the time weighted mean, min and max of power, and the
+    last energy reading with a running sum that survives counter resets and
+    restarts (it continues from the last sum in the recorder).
+    """
+
+    def __init__(self, hass, link, router, featuresets):
+        self._hass = hass
+        self._lwlink = link
+        self._router = router
+        self._featuresets = list(featuresets)
+        size = len(self._featuresets)
+
+        self._power = [None] * size
+        self._power_since = [None] * size
+        self._power_start = [None] * size
+        self._power_integral = [0.0] * size
+        self._power_min = [None] * size
+        self._power_max = [None] * size
+
+        self._energy = [None] * size
+        self._energy_sum = [None] * size
+
+        self._unsubscribe = []
+        self._restore_task = None
+        self.rows = 0
+
+    async def async_start(self):
+        """Subscribe to the featuresets and start the hourly flush."""
+        now = dt_util.utcnow().timestamp()
+        for position, (featureset_id, name) in enumerate(self._featuresets):
+            features = self._lwlink.featuresets[featureset_id].features
+            if "power" in features:
+                self._set_power(position, features["power"].state, now)
+            self._energy[position] = features["energy"].state
+            self._unsubscribe.append(await self._router.async_subscribe(
+                featureset_id, ("power", "energy"), self._make_callback(position)))
+        self._unsubscribe.append(async_track_utc_time_change(self._hass, self._async_flush, minute=0, second=0))
+        self._restore_task = self._hass.async_create_task(self._async_restore_sums())
+
+    @callback
+    def async_stop(self):
+        if self._restore_task is not None:
+            self._restore_task.cancel()
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+
+    def _make_callback(self, position):
+        def statistics_callback(**kwargs):
+            if kwargs["feature"] == "power":
+                self._set_power(position, kwargs["new_value"], dt_util.utcnow().timestamp())
+            else:
+                self._set_energy(position, kwargs["new_value"])
+
+        return statistics_callback
+
+    def _set_power(self, position, value, now):
+        if value is None:
+            return
+        previous = self._power[position]
+        if previous is not None:
+            self._power_integral[position] += previous * (now - self._power_since[position])
+        else:
+            self._power_start[position] = now
+        self._power[position] = value
+        self._power_since[position] = now
+        if self._power_min[position] is None or value < self._power_min[position]:
+            self._power_min[position] = value
+        if self._power_max[position] is None or value > self._power_max[position]:
+            self._power_max[position] = value
+
+    def _set_energy(self, position, value):
+        if value is None:
+            return
+        previous = self._energy[position]
+        if previous is not None and self._energy_sum[position] is not None:
+            # A lower reading means the device counter was reset, count it from zero
+            self._energy_sum[position] += value - previous if value >= previous else value
+        self._energy[position] = value
+
+    async def _async_restore_sums(self):
+        """Continue the energy sums from the last rows in the recorder."""
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        ids = [statistic_id("energy", featureset_id) for featureset_id, name in self._featuresets]
+
+        def read_last():
+            return [get_last_statistics(self._hass, 1, id_, True, {"state", "sum"}).get(id_) for id_ in ids]
+
+        try:
+            last_rows = await get_instance(self._hass).async_add_executor_job(read_last)
+        except Exception:
+            # Without the last sums energy rows would restart from zero, leave them out
+            _LOGGER.exception("Could not read the last energy statistics, energy statistics are disabled")
+            return
+        # Readings that arrived meanwhile are covered by comparing the newest one with the last state
+        for position, rows in enumerate(last_rows):
+            energy = self._energy[position]
+            if not rows:
+                self._energy_sum[position] = 0.0
+                continue
+            last_state = rows[0].get("state") or 0
+            last_sum = rows[0].get("sum") or 0
+            if energy is None:
+                self._energy_sum[position] = last_sum
+            else:
+                self._energy_sum[position] = last_sum + (energy - last_state if energy >= last_state else energy)
+
+    async def _async_flush(self, now):
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        await self._restore_task
+
+        end = now.replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(hours=1)
+        end_ts = end.timestamp()
+        start_ts = start.timestamp()
+
+        rows = 0
+        for position, (featureset_id, name) in enumerate(self._featuresets):
+            power = self._power[position]
+            if power is not None:
+                integral = self._power_integral[position] + power * (end_ts - self._power_since[position])
+                covered = end_ts - max(start_ts, self._power_start[position])
+                mean = integral / covered if covered > 0 else power
+                async_add_external_statistics(self._hass, {
+                    "has_mean": True, "has_sum": False, "name": f"{name} Power", "source": DOMAIN,
+                    "statistic_id": statistic_id("power", featureset_id), "unit_of_measurement": POWER_UNIT,
+                }, [{"start": start, "mean": mean, "min": self._power_min[position], "max": self._power_max[position]}])
+                rows += 1
+                # The value carries over into the next hour
+                self._power_integral[position] = 0.0
+                self._power_since[position] = end_ts
+                self._power_start[position] = end_ts
+                self._power_min[position] = self._power_max[position] = power
+
+            energy = self._energy[position]
+            if energy is not None and self._energy_sum[position] is not None:
+                async_add_external_statistics(self._hass, {
+                    "has_mean": False, "has_sum": True, "name": f"{name} Energy", "source": DOMAIN,
+                    "statistic_id": statistic_id("energy", featureset_id), "unit_of_measurement": ENERGY_UNIT,
+                }, [{"start": start, "state": energy, "sum": self._energy_sum[position]}])
+                rows += 1
+
+        self.rows += rows
+        _LOGGER.debug("Added %s hourly statistics rows for %s", rows, start)
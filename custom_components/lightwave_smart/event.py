@@ -1,5 +1,5 @@
 import logging
-from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, SERVICE_SETBRIGHTNESS, CONF_HOMEKIT, DOMAIN
+from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_DISCOVERY, SERVICE_SETBRIGHTNESS, CONF_HOMEKIT, DOMAIN
 from homeassistant.components.event import (
     EventDeviceClass,
     EventEntity,
@@ -12,7 +12,9 @@ from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .utils import (
     make_device_info,
-    get_extra_state_attributes
+    get_hub_id,
+    get_extra_state_attributes,
+    async_register_feature_callback
 )
 
 DEPENDENCIES = ['lightwave_smart']
@@ -49,14 +51,15 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, asyn
 
     uibuttons = []
     link = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2]
+    discovery = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY]
     homekit = config_entry.options.get(CONF_HOMEKIT, False)
                 
-    for featureset_id, name in link.get_uiButtonPair_producers():
+    for featureset_id, name in discovery.get("uiButtonPair_producer"):
         try:
             uibuttons.append(LWRF2UIButton(name, featureset_id, link, homekit, SMART_SWITCH_PAIR))
         except Exception as e: _LOGGER.exception("Could not add LWRF2UIButton")
 
-    for featureset_id, name in link.get_uiButton_producers():
+    for featureset_id, name in discovery.get("uiButton_producer"):
         try:
             uibuttons.append(LWRF2UIButton(name, featureset_id, link, homekit, SMART_SWITCH))
         except Exception as e: _LOGGER.exception("Could not add LWRF2UIButton")
@@ -76,10 +79,10 @@ class LWRF2UIButton(EventEntity):
         self._featureset_id = featureset_id
         self._lwlink = link
 
-        for hub_featureset_id, hubname in self._lwlink.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
 
         self.entity_description = entity_description
+        self._features = (self.entity_description.key,)
 
         self._homekit = homekit
 
@@ -93,7 +96,7 @@ class LWRF2UIButton(EventEntity):
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to events."""
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
+        await async_register_feature_callback(self, self._features)
         
         registry = er.async_get(self.hass)
         entity_entry = registry.async_get(self.entity_id)
@@ -1,5 +1,5 @@
 import logging
-from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, SERVICE_SETBRIGHTNESS, CONF_HOMEKIT, DOMAIN
+from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_DISCOVERY, SERVICE_SETBRIGHTNESS, CONF_HOMEKIT, DOMAIN
 from homeassistant.components.light import (
     LightEntity,
     LightEntityDescription,
@@ -10,7 +10,14 @@ from homeassistant.helpers import entity_platform, entity_registry as er
 from homeassistant.helpers.entity import EntityCategory
 from .utils import (
     make_device_info,
-    get_extra_state_attributes
+    get_hub_id,
+    get_extra_state_attributes,
+    async_register_feature_callback,
+    async_schedule_state_write,
+    async_write_entity_features,
+    async_write_optimistic,
+    get_optimistic_state,
+    LWRF2FeatureHandles
 )
 
 
@@ -43,17 +50,18 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     lights = []
     link = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2]
+    discovery = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY]
 
     homekit = config_entry.options.get(CONF_HOMEKIT, False)
-    for featureset_id, name in link.get_lights():
+    for featureset_id, name in discovery.get("light"):
         try:
             lights.append(LWRF2Light(name, featureset_id, link, homekit))
         except Exception as e: _LOGGER.exception("Could not add LWRF2Light")
 
 
-    for featureset_id, name in link.get_lights():
+    for featureset_id, name in discovery.get("light"):
         feature_set = link.featuresets[featureset_id]
-        if feature_set.has_led():
+        if discovery.is_kind(featureset_id, "led"):
             channel_input_mapped = None
             if feature_set.has_uiIndicator():
                 ui_io_map_feature = feature_set.get_feature_by_type("uiIOMap")
@@ -67,14 +75,14 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                     
             except Exception as e: _LOGGER.exception("Could not add LWRF2LED")
 
-    for featureset_id, name in link.get_sockets():
-        if link.featuresets[featureset_id].has_led():
+    for featureset_id, name in discovery.get("socket"):
+        if discovery.is_kind(featureset_id, "led"):
             try:
                 lights.append(LWRF2LED(name, featureset_id, link, OFF_LED))
             except Exception as e: _LOGGER.exception("Could not add LWRF2LED")
 
-    for featureset_id, name in link.get_hubs():
-        if link.featuresets[featureset_id].has_led():
+    for featureset_id, name in discovery.get("hub"):
+        if discovery.is_kind(featureset_id, "led"):
             try:
                 lights.append(LWRF2LED(name, featureset_id, link, OFF_LED))
             except Exception as e: _LOGGER.exception("Could not add LWRF2LED")
@@ -83,8 +91,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     async def service_handle_brightness(light, call):
         _LOGGER.debug("Received service call set brightness %s", light._name)
         brightness = int(round(call.data.get("brightness") / 255 * 100))
-        feature_id = link.featuresets[light._featureset_id].features['dimLevel'].id
-        await link.async_write_feature(feature_id, brightness)
+        await async_write_entity_features(light, [("dimLevel", brightness)])
 
     platform = entity_platform.async_get_current_platform()
     platform.async_register_entity_service(SERVICE_SETBRIGHTNESS, None, service_handle_brightness, )
@@ -103,10 +110,10 @@ class LWRF2Light(LightEntity):
         self._featureset_id = featureset_id
         self._lwlink = link
 
-        for hub_featureset_id, hubname in self._lwlink.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
 
         self.entity_description = LIGHT
+        self._features = ("switch", "dimLevel", "uiButtonPair")
 
         self._homekit = homekit
 
@@ -117,10 +124,11 @@ class LWRF2Light(LightEntity):
         self._attr_device_info = make_device_info(self, name)
 
 
-        self._state = \
-            self._lwlink.featuresets[self._featureset_id].features["switch"].state
+        self._handles = LWRF2FeatureHandles(self._lwlink, self._featureset_id, ("switch", "dimLevel"))
+        switch, dim_level = self._handles.get()
+        self._state = switch.state
         
-        dimLevel = self._lwlink.featuresets[self._featureset_id].features["dimLevel"].state
+        dimLevel = dim_level.state
         self._brightness = int(round(dimLevel / 100 * 255)) if dimLevel is not None else None
         
         self._has_led = self._lwlink.featuresets[self._featureset_id].has_led()
@@ -128,7 +136,7 @@ class LWRF2Light(LightEntity):
 
     async def async_added_to_hass(self):
         """Subscribe to events."""
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
+        await async_register_feature_callback(self, self._features)
         registry = er.async_get(self.hass)
         entity_entry = registry.async_get(self.entity_id)
         if self._homekit and self._gen2:
@@ -140,8 +148,6 @@ class LWRF2Light(LightEntity):
             if entity_entry.hidden_by == er.RegistryEntryHider.INTEGRATION:
                 registry.async_update_entity(self.entity_id, hidden_by=None)
 
-    #TODO add async_will_remove_from_hass() to clean up
-
     @callback
     def async_update_callback(self, **kwargs):
         """Update the component's state."""
@@ -149,7 +155,7 @@ class LWRF2Light(LightEntity):
             _LOGGER.debug("Button (light) press event: %s %s", self.entity_id, kwargs["new_value"])
             self.hass.bus.fire("lightwave_smart.click",{"entity_id": self.entity_id, "code": kwargs["new_value"]},
         )
-        self.async_schedule_update_ha_state(True)
+        async_schedule_state_write(self)
 
     @property
     def supported_color_modes(self):
@@ -163,9 +169,9 @@ class LWRF2Light(LightEntity):
 
     async def async_update(self):
         """Update state"""
-        self._state = \
-            self._lwlink.featuresets[self._featureset_id].features["switch"].state
-        dimLevel = self._lwlink.featuresets[self._featureset_id].features["dimLevel"].state
+        switch, dim_level = self._handles.get()
+        self._state = get_optimistic_state(self, "switch", switch.state)
+        dimLevel = get_optimistic_state(self, "dimLevel", dim_level.state)
         self._brightness = int(round(dimLevel / 100 * 255)) if dimLevel is not None else None
 
     @property
@@ -182,14 +188,15 @@ class LWRF2Light(LightEntity):
         """Turn the Lightwave light on."""
         _LOGGER.debug("HA light.turn_on received, kwargs: %s", kwargs)
 
+        writes = []
         if ATTR_BRIGHTNESS in kwargs:
             _LOGGER.debug("Changing brightness from %s to %s (%s%%)", self._brightness, kwargs[ATTR_BRIGHTNESS], int(kwargs[ATTR_BRIGHTNESS] / 255 * 100))
             self._brightness = kwargs[ATTR_BRIGHTNESS]
-            await self._lwlink.async_set_brightness_by_featureset_id(
-                self._featureset_id, int(round(self._brightness / 255 * 100)))
+            writes.append(("dimLevel", int(round(self._brightness / 255 * 100))))
 
         self._state = True
-        await self._lwlink.async_turn_on_by_featureset_id(self._featureset_id)
+        writes.append(("switch", 1))
+        await async_write_optimistic(self, writes)
 
         self.async_schedule_update_ha_state()
 
@@ -198,7 +205,7 @@ class LWRF2Light(LightEntity):
         _LOGGER.debug("HA light.turn_off received, kwargs: %s", kwargs)
 
         self._state = False
-        await self._lwlink.async_turn_off_by_featureset_id(self._featureset_id)
+        await async_write_optimistic(self, [("switch", 0)])
         self.async_schedule_update_ha_state()
 
     async def async_set_rgb(self, led_rgb):
@@ -221,8 +228,7 @@ class LWRF2LED(LightEntity):
         self._featureset_id = featureset_id
         self._lwlink = link
 
-        for hub_featureset_id, hubname in self._lwlink.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
 
         self.entity_description = description
 
@@ -233,10 +239,12 @@ class LWRF2LED(LightEntity):
         self._attr_device_info = make_device_info(self, name)
         
         self.feature_type = feature_type
+        self._features = (self.feature_type,)
+
+        self._handles = LWRF2FeatureHandles(self._lwlink, self._featureset_id, (self.feature_type,))
 
         # feature_type uiIndicator is not readable from Link (though server may have cache), events are generated when its changed
-        color = \
-            self._lwlink.featuresets[self._featureset_id].features[self.feature_type].state
+        color = self._handles.get()[0].state
         if color == 0 or not color:
             self._state = False
             self._r = 255
@@ -256,15 +264,13 @@ class LWRF2LED(LightEntity):
     async def async_added_to_hass(self):
         """Subscribe to events."""
         _LOGGER.debug("async_added_to_hass - for %s ", self._featureset_id)
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
-
-    #TODO add async_will_remove_from_hass() to clean up
+        await async_register_feature_callback(self, self._features)
 
     @callback
     def async_update_callback(self, **kwargs):
         """Update the component's state."""
         _LOGGER.debug("async_update_callback - for %s - %s ", self._featureset_id, kwargs)
-        self.async_schedule_update_ha_state(True)
+        async_schedule_state_write(self)
 
     @property
     def supported_color_modes(self):
@@ -278,8 +284,7 @@ class LWRF2LED(LightEntity):
 
     async def async_update(self):
         """Update state"""
-        color = \
-            self._lwlink.featuresets[self._featureset_id].features[self.feature_type].state
+        color = self._handles.get()[0].state
         
         if color == 0 or not color:
             self._state = False
@@ -324,7 +329,7 @@ class LWRF2LED(LightEntity):
         b = int(self._b * self._brightness /255)
         rgb = r * 65536 + g * 256 + b
 
-        await self._lwlink.async_set_led_rgb_by_featureset_id(self._featureset_id, rgb, self.feature_type)
+        await async_write_entity_features(self, [(self.feature_type, rgb)])
 
         self.async_schedule_update_ha_state()
 
@@ -332,7 +337,7 @@ class LWRF2LED(LightEntity):
         """Turn the Lightwave LED off."""
         _LOGGER.debug("HA led.turn_off received, kwargs: %s", kwargs)
         self._state = False
-        await self._lwlink.async_set_led_rgb_by_featureset_id(self._featureset_id, 0, self.feature_type)
+        await async_write_entity_features(self, [(self.feature_type, 0)])
 
         self.async_schedule_update_ha_state()
 
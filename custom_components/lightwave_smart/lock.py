@@ -1,11 +1,16 @@
 import logging
-from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, DOMAIN
+from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_DISCOVERY, DOMAIN
 from homeassistant.components.lock import LockEntity, LockEntityDescription, LockEntityFeature
 from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityCategory
 from .utils import (
     make_device_info,
-    get_extra_state_attributes
+    get_hub_id,
+    get_extra_state_attributes,
+    async_register_feature_callback,
+    async_schedule_state_write,
+    async_write_optimistic,
+    get_feature_state
 )
 
 DEPENDENCIES = ['lightwave_smart']
@@ -22,8 +27,9 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     locks = []
     link = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2]
+    discovery = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY]
 
-    for featureset_id, name in link.get_with_feature("protection"):
+    for featureset_id, name in discovery.with_feature("protection"):
         try:
             locks.append(LWRF2Lock(name, featureset_id, link, LOCK))
         except Exception as e: _LOGGER.exception("Could not add LWRF2Lock")
@@ -42,10 +48,10 @@ class LWRF2Lock(LockEntity):
         self._featureset_id = featureset_id
         self._lwlink = link
 
-        for hub_featureset_id, hubname in self._lwlink.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
 
         self.entity_description = description
+        self._features = ("protection",)
 
         self._state = \
             self._lwlink.featuresets[self._featureset_id].features["protection"].state
@@ -59,19 +65,16 @@ class LWRF2Lock(LockEntity):
 
     async def async_added_to_hass(self):
         """Subscribe to events."""
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
-
-    #TODO add async_will_remove_from_hass() to clean up
+        await async_register_feature_callback(self, self._features)
 
     @callback
     def async_update_callback(self, **kwargs):
         """Update the component's state."""
-        self.async_schedule_update_ha_state(True)
+        async_schedule_state_write(self)
 
     async def async_update(self):
         """Update state"""
-        self._state = \
-            self._lwlink.featuresets[self._featureset_id].features["protection"].state
+        self._state = get_feature_state(self, "protection")
 
     @property
     def is_locked(self):
@@ -83,8 +86,7 @@ class LWRF2Lock(LockEntity):
         _LOGGER.debug("HA lock.lock received, kwargs: %s", kwargs)
 
         self._state = 1
-        feature_id = self._lwlink.featuresets[self._featureset_id].features['protection'].id
-        await self._lwlink.async_write_feature(feature_id, 1)
+        await async_write_optimistic(self, [("protection", 1)])
 
         self.async_schedule_update_ha_state()
 
@@ -93,8 +95,7 @@ class LWRF2Lock(LockEntity):
         _LOGGER.debug("HA lock.unlock received, kwargs: %s", kwargs)
 
         self._state = 0
-        feature_id = self._lwlink.featuresets[self._featureset_id].features['protection'].id
-        await self._lwlink.async_write_feature(feature_id, 0)
+        await async_write_optimistic(self, [("protection", 0)])
 
         self.async_schedule_update_ha_state()
 
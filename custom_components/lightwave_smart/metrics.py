@@ -0,0 +1,150 @@
+import collections
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds the event rate is averaged over
+EVENT_RATE_WINDOW = 60
+# Number of most recent command round trips the percentiles are taken from
+COMMAND_SAMPLES = 256
+# Upper bounds, in milliseconds, of the command round trip histogram buckets
+COMMAND_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def percentile(samples, fraction):
+    """Return the value below which the given fraction of samples fall (nearest rank), or None."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LWRF2Metrics:
+    """Runtime counters of a config entry, cheap enough to keep on the event path.
+
+    Events are counted into one-second buckets so the rate needs no timer,
+    command round trips keep a bounded window of samples, and reconnects are
+    timed by wrapping the link's websocket connect, which also calls the
+    reconnect listeners. Dispatch and state write
+    counters live in the router and coalescer, snapshot() collects them all.
+    """
+
+    def __init__(self):
+        self._router = None
+        self._coalescer = None
+        self._event_buckets = collections.deque(maxlen=EVENT_RATE_WINDOW + 1)
+        self._command_times = collections.deque(maxlen=COMMAND_SAMPLES)
+        self._reconnect_listeners = []
+
+        self.events = 0
+        self.commands = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.last_reconnect_duration = None
+        self.last_reconnect = None
+        self.resyncs = 0
+        self.last_resync_duration = None
+        self.last_resync_changed = None
+        self.reconcile_reads = 0
+        self.reconcile_mismatches = 0
+
+    def bind(self, router, coalescer):
+        """Report the dispatch and state write counters of the entry's router and coalescer."""
+        self._router = router
+        self._coalescer = coalescer
+
+    def record_event(self, **kwargs):
+        """Count a feature event, usable as a general link callback."""
+        self.events += 1
+        second = int(time.monotonic())
+        if self._event_buckets and self._event_buckets[-1][0] == second:
+            self._event_buckets[-1][1] += 1
+        else:
+            self._event_buckets.append([second, 1])
+
+    def events_per_second(self):
+        """Return the average event rate over the last EVENT_RATE_WINDOW seconds."""
+        since = int(time.monotonic()) - EVENT_RATE_WINDOW
+        return sum(count for second, count in self._event_buckets if second > since) / EVENT_RATE_WINDOW
+
+    def record_command(self, duration):
+        """Record the round trip time of a write, in seconds."""
+        self.commands += 1
+        self._command_times.append(duration)
+
+    def command_times(self):
+        """Return the recent command round trip times, in seconds."""
+        return list(self._command_times)
+
+    def command_histogram(self):
+        """Return the recent command round trips counted into COMMAND_BUCKETS, keyed by upper bound."""
+        histogram = {f"<={bound}ms": 0 for bound in COMMAND_BUCKETS}
+        histogram[f">{COMMAND_BUCKETS[-1]}ms"] = 0
+        for duration in self._command_times:
+            milliseconds = duration * 1000
+            bound = next((bound for bound in COMMAND_BUCKETS if milliseconds <= bound), None)
+            histogram[f"<={bound}ms" if bound is not None else f">{COMMAND_BUCKETS[-1]}ms"] += 1
+        return histogram
+
+    def record_resync(self, duration, changed):
+        """Record how long a resync took, in seconds, and how many features it found changed."""
+        self.resyncs += 1
+        self.last_resync_duration = duration
+        self.last_resync_changed = changed
+
+    def record_reconcile(self, read, mismatches):
+        """Count features read back by reconciliation and how many of them were out of date."""
+        self.reconcile_reads += read
+        self.reconcile_mismatches += mismatches
+
+    def add_reconnect_listener(self, listener):
+        """Call listener after every reconnect, returns a function removing it."""
+        self._reconnect_listeners.append(listener)
+        return lambda: self._reconnect_listeners.remove(listener)
+
+    def watch_connection(self, link):
+        """Time the link's websocket (re)connects. The first connect is not counted as a reconnect."""
+        ws = getattr(link, "_ws", None)
+        connect = getattr(ws, "async_connect", None)
+        if connect is None:
+            # The public API has no websocket to lose
+            return
+
+        async def async_timed_connect(*args, **kwargs):
+            start = time.monotonic()
+            result = await connect(*args, **kwargs)
+            if result:
+                self.connects += 1
+                if self.connects > 1:
+                    self.reconnects += 1
+                    self.last_reconnect_duration = time.monotonic() - start
+                    self.last_reconnect = time.time()
+                    _LOGGER.debug("Reconnected to Lightwave in %.2f seconds", self.last_reconnect_duration)
+                    for listener in tuple(self._reconnect_listeners):
+                        listener()
+            return result
+
+        ws.async_connect = async_timed_connect
+
+    def snapshot(self):
+        """Return every counter as a dict, times in milliseconds."""
+        times = self._command_times
+        p50 = percentile(times, 0.5)
+        p95 = percentile(times, 0.95)
+        return {
+            "events": self.events,
+            "events_per_second": round(self.events_per_second(), 2),
+            "callbacks_dispatched": self._router.dispatched if self._router is not None else None,
+            "state_writes": self._coalescer.emitted if self._coalescer is not None else None,
+            "commands": self.commands,
+            "command_rtt_p50": round(p50 * 1000, 1) if p50 is not None else None,
+            "command_rtt_p95": round(p95 * 1000, 1) if p95 is not None else None,
+            "reconnects": self.reconnects,
+            "last_reconnect_duration": round(self.last_reconnect_duration, 3) if self.last_reconnect_duration is not None else None,
+            "resyncs": self.resyncs,
+            "last_resync_duration": round(self.last_resync_duration, 3) if self.last_resync_duration is not None else None,
+            "last_resync_changed": self.last_resync_changed,
+            "reconcile_reads": self.reconcile_reads,
+            "reconcile_mismatches": self.reconcile_mismatches,
+        }
@@ -0,0 +1,86 @@
+import logging
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LWRF2OptimisticTracker:
+    """Track written feature values until the device confirms them.
+
+    An entity shows the written value straight away. It is confirmed when an
+    update of the feature reports that value, and rolled back to the reported
+    state as soon as the write fails, or when no confirmation arrives before
+    the deadline.
+    """
+
+    def __init__(self, hass, timeout):
+        self._hass = hass
+        self._timeout = timeout
+        self._pending = {}
+
+        self.confirmed = 0
+        self.failed = 0
+
+    @callback
+    def async_set(self, entity, feature, value):
+        """Record a value written to a feature of the entity's featureset."""
+        key = (entity._featureset_id, feature)
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending[2].cancel()
+        if entity._lwlink.featuresets[entity._featureset_id].features[feature].state == value:
+            # Already reported, there is nothing to confirm
+            return
+        handle = self._hass.loop.call_later(self._timeout, self._async_expire, key)
+        self._pending[key] = (value, entity, handle)
+
+    def value(self, featureset_id, feature, state):
+        """Return the value to show for a feature whose reported state is state."""
+        pending = self._pending.get((featureset_id, feature))
+        return state if pending is None else pending[0]
+
+    @callback
+    def async_feature_update(self, featureset_id, feature, value):
+        """Confirm a pending value the feature now reports, called for every feature update."""
+        if not self._pending:
+            return
+        pending = self._pending.get((featureset_id, feature))
+        if pending is not None and value == pending[0]:
+            del self._pending[(featureset_id, feature)]
+            pending[2].cancel()
+            self.confirmed += 1
+
+    @callback
+    def async_rollback(self, featureset_id, feature):
+        """Drop a pending value whose write failed, the entity falls back to the reported state."""
+        pending = self._pending.pop((featureset_id, feature), None)
+        if pending is None:
+            return
+        pending[2].cancel()
+        _LOGGER.warning("Write of %s = %s for %s failed, rolling back", feature, pending[0], featureset_id)
+        self._async_fail(pending)
+
+    @callback
+    def _async_expire(self, key):
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            _LOGGER.warning("No confirmation of %s = %s for %s, rolling back", key[1], pending[0], key[0])
+            self._async_fail(pending)
+
+    @callback
+    def _async_fail(self, pending):
+        self.failed += 1
+        entity = pending[1]
+        if entity.hass is not None:
+            entity.async_schedule_update_ha_state(True)
+
+    @callback
+    def async_cancel(self):
+        """Drop every pending value."""
+        for pending in self._pending.values():
+            pending[2].cancel()
+        self._pending = {}
+
+    def stats(self):
+        """Return the confirmed and failed write counters."""
+        return {"confirmed": self.confirmed, "failed": self.failed, "pending": len(self._pending)}
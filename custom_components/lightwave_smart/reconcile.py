@@ -0,0 +1,117 @@
+import logging
+import random
+import time
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from .const import BULK_CHUNK_SIZE, RECONCILE_JITTER
+from .resync import async_read_changes
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LWRF2Reconciler:
+    """Read back a small slice of featuresets at a time, so every state is checked once per period.
+
+    Each tick reads one slice, whole featuresets of up to BULK_CHUNK_SIZE
+    features, in a single request. A featureset with more features than that
+    is split over several slices. Ticks are spaced so a sweep of every slice
+    takes the period, but never closer than the budget of requests per minute
+    allows, and each delay is jittered so entries and restarts do not line up.
+    A value that differs from the cached one is a mismatch: it is counted and
+    dispatched like an event.
+    """
+
+    def __init__(self, hass, link, router, metrics, period, budget):
+        self._hass = hass
+        self._lwlink = link
+        self._router = router
+        self._metrics = metrics
+        self._period = period
+        self._budget = budget
+        self._slices = None
+        self._sliced_featuresets = None
+        self._position = 0
+        self._sweep_started = None
+        self._unsubscribe = None
+        self._stopped = False
+
+        self.sweeps = 0
+        self.last_sweep_duration = None
+
+    def _get_slices(self):
+        if self._sliced_featuresets is not self._lwlink.featuresets:
+            # The link replaces its featuresets dict whenever the hierarchy is read
+            self._sliced_featuresets = self._lwlink.featuresets
+            self._slices = [[]]
+            seen = set()
+            for featureset in self._sliced_featuresets.values():
+                feature_ids = [feature.id for feature in featureset.features.values() if feature.id not in seen]
+                seen.update(feature_ids)
+                if self._slices[-1] and len(self._slices[-1]) + len(feature_ids) > BULK_CHUNK_SIZE:
+                    self._slices.append([])
+                for feature_id in feature_ids:
+                    if len(self._slices[-1]) >= BULK_CHUNK_SIZE:
+                        self._slices.append([])
+                    self._slices[-1].append(feature_id)
+            self._position = 0
+        return self._slices
+
+    def interval(self):
+        """Return the seconds between ticks, before jitter."""
+        return max(self._period / len(self._get_slices()), 60 / self._budget)
+
+    @callback
+    def async_start(self):
+        """Start ticking, the first tick is jittered too."""
+        self._schedule()
+
+    def _schedule(self):
+        # Jitter never brings ticks closer than the budget allows
+        delay = max(self.interval() * random.uniform(1 - RECONCILE_JITTER, 1 + RECONCILE_JITTER), 60 / self._budget)
+        self._unsubscribe = async_call_later(self._hass, delay, self._async_tick)
+
+    async def _async_tick(self, now):
+        self._unsubscribe = None
+        try:
+            slices = self._get_slices()
+            if self._position == 0:
+                self._sweep_started = time.monotonic()
+            feature_ids = slices[self._position]
+            read, mismatches = await async_read_changes(self._lwlink, self._router, feature_ids, max_concurrency=1)
+            if self._stopped:
+                return
+            self._metrics.record_reconcile(read, mismatches)
+            if mismatches:
+                _LOGGER.debug("Reconciliation found %s of %s features out of date", mismatches, read)
+
+            self._position += 1
+            if self._position >= len(slices):
+                self._position = 0
+                self.sweeps += 1
+                self.last_sweep_duration = time.monotonic() - self._sweep_started
+        except Exception:
+            _LOGGER.exception("Error reconciling Lightwave states")
+            # Start the sweep over, e.g. after the hierarchy changed under the tick
+            self._position = 0
+        finally:
+            if not self._stopped:
+                self._schedule()
+
+    @callback
+    def async_stop(self):
+        self._stopped = True
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def stats(self):
+        """Return the sweep progress and counters."""
+        return {
+            "slices": len(self._get_slices()),
+            "position": self._position,
+            "interval": round(self.interval(), 1),
+            "sweeps": self.sweeps,
+            "last_sweep_duration": round(self.last_sweep_duration, 1) if self.last_sweep_duration is not None else None,
+            "reads": self._metrics.reconcile_reads,
+            "mismatches": self._metrics.reconcile_mismatches,
+        }
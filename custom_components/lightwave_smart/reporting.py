@@ -0,0 +1,165 @@
+import logging
+import time
+from homeassistant.core import callback
+from .const import CONF_DEADBAND_POWER, CONF_DEADBAND_CURRENT, CONF_DEADBAND_VOLTAGE, CONF_DEADBAND_RSSI, \
+    CONF_DEADBAND_RELATIVE, CONF_MIN_REPORT_INTERVAL, CONF_REPORT_HEARTBEAT, DEFAULT_DEADBANDS, \
+    DEFAULT_DEADBAND_RELATIVE, DEFAULT_MIN_REPORT_INTERVAL, DEFAULT_REPORT_HEARTBEAT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sensor description keys with a reporting policy, and the option holding each one's absolute deadband.
+# Energy is a running total and is never filtered.
+DEADBAND_OPTIONS = {
+    "power": CONF_DEADBAND_POWER,
+    "current": CONF_DEADBAND_CURRENT,
+    "voltage": CONF_DEADBAND_VOLTAGE,
+    "rssi": CONF_DEADBAND_RSSI,
+}
+
+_UNSET = object()
+
+
+class LWRF2ReportingPolicy:
+    """When a new sensor value is worth a state write.
+
+    A value is published if it moved by at least the larger of the absolute
+    deadband and the relative one (a fraction of the last published value), no
+    sooner than min_interval seconds after the previous publish. A value within
+    the deadband is still published once heartbeat seconds have passed.
+    """
+
+    def __init__(self, absolute=0, relative=0, min_interval=0, heartbeat=0):
+        self.absolute = absolute
+        self.relative = relative
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+
+    def is_active(self):
+        """Return whether the policy can hold back any value."""
+        return bool(self.absolute or self.relative or self.min_interval)
+
+    def changed_enough(self, value, published):
+        """Return whether value is outside the deadband around the published value."""
+        if published is _UNSET or value is None or published is None:
+            return value != published
+        threshold = max(self.absolute, self.relative * abs(published))
+        if threshold == 0:
+            return value != published
+        return abs(value - published) >= threshold
+
+
+def build_reporting_policies(options):
+    """Return sensor description key -> LWRF2ReportingPolicy from the config entry options."""
+    relative = options.get(CONF_DEADBAND_RELATIVE, DEFAULT_DEADBAND_RELATIVE) / 100
+    min_interval = options.get(CONF_MIN_REPORT_INTERVAL, DEFAULT_MIN_REPORT_INTERVAL)
+    heartbeat = options.get(CONF_REPORT_HEARTBEAT, DEFAULT_REPORT_HEARTBEAT)
+    return {
+        key: LWRF2ReportingPolicy(options.get(option, DEFAULT_DEADBANDS[key]), relative, min_interval, heartbeat)
+        for key, option in DEADBAND_OPTIONS.items()
+    }
+
+
+class LWRF2ReportingFilter:
+    """Apply a reporting policy to one sensor's value ahead of its state writes.
+
+    get_value returns the current value and write schedules the state write.
+    The entity shows value, which only the filter advances. A value held back
+    by the minimum interval is written when the interval ends, if it is then
+    still outside the deadband, so the last change is never lost.
+    A value held back by the deadband is written once the heartbeat is due,
+    even if no further value arrives.
+    """
+
+    def __init__(self, hass, policy, get_value, write):
+        self._hass = hass
+        self._policy = policy
+        self._get_value = get_value
+        self._write = write
+        self._published = _UNSET
+        self._published_at = None
+        self._handle = None
+        self._heartbeat_handle = None
+
+        self.published = 0
+        self.suppressed = 0
+
+    @property
+    def value(self):
+        """Return the value last published, the one the entity shows."""
+        return None if self._published is _UNSET else self._published
+
+    def set_published(self, value):
+        """Take value as published without a write, e.g. the value the entity is added with."""
+        self._published = value
+        self._published_at = time.monotonic()
+
+    @callback
+    def async_offer(self):
+        """Consider the current value for a state write."""
+        if self._handle is not None:
+            # The write at the end of the interval picks up the newest value
+            self.suppressed += 1
+            return
+
+        value = self._get_value()
+        now = time.monotonic()
+        elapsed = None if self._published_at is None else now - self._published_at
+        heartbeat_due = self._policy.heartbeat and elapsed is not None and elapsed >= self._policy.heartbeat
+        if not heartbeat_due and not self._policy.changed_enough(value, self._published):
+            self.suppressed += 1
+            self._hold(value, now)
+            return
+
+        if elapsed is not None and elapsed < self._policy.min_interval:
+            self.suppressed += 1
+            self._handle = self._hass.loop.call_later(self._policy.min_interval - elapsed, self._async_interval_ended)
+            return
+        self._publish(value, now)
+
+    @callback
+    def _async_interval_ended(self):
+        self._handle = None
+        value = self._get_value()
+        if self._policy.changed_enough(value, self._published):
+            self._publish(value, time.monotonic())
+        else:
+            self._hold(value, time.monotonic())
+
+    def _hold(self, value, now):
+        """Make sure a value held back by the deadband is written when the heartbeat is due."""
+        if self._policy.heartbeat and self._heartbeat_handle is None and value != self._published:
+            self._heartbeat_handle = self._hass.loop.call_later(
+                self._policy.heartbeat - (now - self._published_at), self._async_heartbeat)
+
+    @callback
+    def _async_heartbeat(self):
+        self._heartbeat_handle = None
+        if self._handle is not None:
+            # The write at the end of the interval is still to come
+            return
+        value = self._get_value()
+        if value != self._published:
+            self._publish(value, time.monotonic())
+
+    def _publish(self, value, now):
+        if self._heartbeat_handle is not None:
+            self._heartbeat_handle.cancel()
+            self._heartbeat_handle = None
+        self._published = value
+        self._published_at = now
+        self.published += 1
+        self._write()
+
+    @callback
+    def async_cancel(self):
+        """Drop pending writes."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._heartbeat_handle is not None:
+            self._heartbeat_handle.cancel()
+            self._heartbeat_handle = None
+
+    def stats(self):
+        """Return the published and suppressed value counters."""
+        return {"published": self.published, "suppressed": self.suppressed}
@@ -0,0 +1,88 @@
+import logging
+import time
+from homeassistant.core import callback
+from .commands import async_bulk_read
+from .const import RESYNC_MAX_CONCURRENCY, MOMENTARY_FEATURES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_read_changes(link, router, feature_ids, max_concurrency=RESYNC_MAX_CONCURRENCY):
+    """Read features and dispatch the ones whose value differs from the cached one.
+
+    A feature changed by an event while the reads were in flight is left
+    alone, the event is newer than the read. Momentary features (button
+    presses) are stored without dispatching, a press missed while
+    disconnected must not reach automations late. Returns (features read,
+    features changed).
+    """
+    # The router's index covers the public API link too, which has no features dict
+    features = {feature_id: router.get_feature(feature_id)[0] for feature_id in feature_ids}
+    cached = {feature_id: feature.state for feature_id, feature in features.items()}
+
+    values = await async_bulk_read(link, cached, max_concurrency=max_concurrency)
+
+    changed = 0
+    for feature_id, value in values.items():
+        previous = cached[feature_id]
+        if value == previous or features[feature_id].state != previous:
+            continue
+        if features[feature_id].name in MOMENTARY_FEATURES:
+            features[feature_id].update_feature_state(value)
+            continue
+        router.dispatch_feature_event(feature_id, value)
+        changed += 1
+    return len(values), changed
+
+
+class LWRF2Resync:
+    """Catch up with feature changes missed while the websocket was down.
+
+    Every feature is read again, in batched requests with bounded concurrency,
+    and only values that differ from the cached ones are stored and dispatched
+    through the router, so entities whose features did not change are not
+    written.
+    """
+
+    def __init__(self, hass, link, router, metrics, max_concurrency=RESYNC_MAX_CONCURRENCY):
+        self._hass = hass
+        self._lwlink = link
+        self._router = router
+        self._metrics = metrics
+        self._max_concurrency = max_concurrency
+        self._task = None
+        self._again = False
+
+    @callback
+    def async_schedule(self):
+        """Start a resync, or queue one more if one is running."""
+        if self._task is not None and not self._task.done():
+            self._again = True
+            return
+        self._task = self._hass.async_create_background_task(self._async_run(), "lightwave_smart resync")
+
+    async def _async_run(self):
+        while True:
+            self._again = False
+            await self.async_resync()
+            if not self._again:
+                return
+
+    async def async_resync(self):
+        """Read every feature, dispatch the ones that changed and return how many did."""
+        started = time.monotonic()
+        features = list(self._lwlink.features)
+        read, changed = await async_read_changes(self._lwlink, self._router, features, self._max_concurrency)
+
+        duration = time.monotonic() - started
+        self._metrics.record_resync(duration, changed)
+        _LOGGER.info("Resynced %s of %s Lightwave features in %.2f seconds, %s changed",
+                     read, len(features), duration, changed)
+        return changed
+
+    @callback
+    def async_cancel(self):
+        """Stop a running resync."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
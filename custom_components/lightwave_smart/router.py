@@ -0,0 +1,153 @@
+import logging
+from .const import MOMENTARY_FEATURES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LWRF2FeatureRouter:
+    """Route Lightwave feature events to the entities that depend on them.
+
+    The link only knows about featureset-wide callbacks, so the router registers
+    a single callback per featureset and fans each event out to the subscribers
+    of that (featureset_id, feature name) pair only.
+    """
+
+    def __init__(self, link):
+        self._lwlink = link
+        self._subscribers = {}
+        self._registered = set()
+        self._feature_index = None
+        self._indexed_featuresets = None
+        self._generation = 0
+        self._versions = {}
+        self._listeners = []
+
+        self.dispatched = 0
+
+    async def async_subscribe(self, featureset_id, features, callback):
+        """Subscribe callback to the given feature names, returns an unsubscribe function."""
+        keys = [(featureset_id, feature) for feature in features]
+        for key in keys:
+            self._subscribers.setdefault(key, []).append(callback)
+
+        if featureset_id not in self._registered:
+            self._registered.add(featureset_id)
+            await self._lwlink.async_register_feature_callback(
+                featureset_id, self._make_featureset_callback(featureset_id))
+
+        def unsubscribe():
+            for key in keys:
+                callbacks = self._subscribers.get(key)
+                if callbacks and callback in callbacks:
+                    callbacks.remove(callback)
+                    if not callbacks:
+                        del self._subscribers[key]
+
+        return unsubscribe
+
+    def add_listener(self, listener):
+        """Call listener(featureset_id, feature, value) for every dispatched feature, returns a function removing it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _make_featureset_callback(self, featureset_id):
+        def featureset_callback(**kwargs):
+            self.dispatch(featureset_id, **kwargs)
+
+        featureset_callback.__name__ = f"router_{featureset_id}"
+        return featureset_callback
+
+    def dispatch(self, featureset_id, **kwargs):
+        """Call the subscribers of a single feature of a featureset."""
+        self._versions[featureset_id] = self._versions.get(featureset_id, 0) + 1
+        for listener in self._listeners:
+            listener(featureset_id, kwargs["feature"], kwargs["new_value"])
+        callbacks = self._subscribers.get((featureset_id, kwargs["feature"]))
+        if not callbacks:
+            return
+        self.dispatched += len(callbacks)
+        # Copy as a callback may unsubscribe while we iterate
+        for callback in tuple(callbacks):
+            try:
+                callback(**kwargs)
+            except Exception:
+                _LOGGER.exception("Error in feature callback for %s - %s", featureset_id, kwargs["feature"])
+
+    def version(self, featureset_id):
+        """Return a value that changes whenever a feature of the featureset changes."""
+        return (self._generation, self._versions.get(featureset_id, 0))
+
+    def invalidate(self):
+        """Mark every featureset as changed, used after states are read without events."""
+        self._generation += 1
+
+    def _get_feature_index(self):
+        if self._indexed_featuresets is not self._lwlink.featuresets:
+            # The link replaces its featuresets dict whenever the hierarchy is read
+            self._indexed_featuresets = self._lwlink.featuresets
+            self._feature_index = {}
+            for featureset_id, featureset in self._indexed_featuresets.items():
+                for feature in featureset.features.values():
+                    entry = self._feature_index.setdefault(feature.id, (feature, []))
+                    entry[1].append(featureset_id)
+        return self._feature_index
+
+    def get_feature(self, feature_id):
+        """Return (feature, featureset ids) for a feature id, or None if unknown."""
+        return self._get_feature_index().get(feature_id)
+
+    def dispatch_feature_event(self, feature_id, value):
+        """Store a new feature value and call the subscribers of every featureset it belongs to."""
+        entry = self.get_feature(feature_id)
+        if entry is None:
+            _LOGGER.warning("Event received for unknown feature: %s", feature_id)
+            return None
+        feature, featureset_ids = entry
+        prev_value = feature.state
+        feature.update_feature_state(value)
+        for featureset_id in featureset_ids:
+            self.dispatch(featureset_id, feature=feature.name, feature_id=feature.id, prev_value=prev_value, new_value=value)
+        return feature
+
+    def dispatch_changes(self, previous_states):
+        """Call the subscribers of every feature whose value differs from previous_states.
+
+        Used after states were read in bulk, which updates features without events.
+        Momentary features (button presses) are not dispatched, the value read is
+        an old press. Returns the number of changed features.
+        """
+        changed = 0
+        for feature_id, (feature, featureset_ids) in self._get_feature_index().items():
+            prev_value = previous_states.get(feature_id)
+            if feature.state == prev_value or feature.name in MOMENTARY_FEATURES:
+                continue
+            changed += 1
+            for featureset_id in featureset_ids:
+                self.dispatch(featureset_id, feature=feature.name, feature_id=feature.id, prev_value=prev_value, new_value=feature.state)
+        return changed
+
+    def subscriber_count(self, featureset_id=None):
+        """Return the number of subscriptions, optionally for one featureset."""
+        return sum(
+            len(callbacks) for (fs_id, feature), callbacks in self._subscribers.items()
+            if featureset_id is None or fs_id == featureset_id
+        )
+
+    def subscriber_counts(self):
+        """Return featureset id -> number of subscriptions."""
+        counts = {}
+        for (featureset_id, feature), callbacks in self._subscribers.items():
+            counts[featureset_id] = counts.get(featureset_id, 0) + len(callbacks)
+        return counts
+
+    def fan_out(self):
+        """Return statistics of the number of callbacks per subscribed feature."""
+        sizes = [len(callbacks) for callbacks in self._subscribers.values()]
+        return {
+            "features": len(sizes),
+            "featuresets": len(self._registered),
+            "subscriptions": sum(sizes),
+            "max": max(sizes, default=0),
+            "mean": round(sum(sizes) / len(sizes), 2) if sizes else 0,
+            "dispatched": self.dispatched,
+        }
@@ -1,5 +1,8 @@
 import logging
-from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, DOMAIN
+import time
+from functools import lru_cache
+from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_DISCOVERY, LIGHTWAVE_METRICS, METRICS_INTERVAL, \
+    CONF_EVENT_SENSOR_INTERVAL, DEFAULT_EVENT_SENSOR_INTERVAL, LIGHTWAVE_RECONCILER, DOMAIN
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 # State Classes
 try:
@@ -13,6 +16,7 @@ try:
     from homeassistant.components.sensor import SensorDeviceClass
     DEVICE_CLASS_BATTERY = SensorDeviceClass.BATTERY
     DEVICE_CLASS_CURRENT = SensorDeviceClass.CURRENT
+    DEVICE_CLASS_DURATION = SensorDeviceClass.DURATION
     DEVICE_CLASS_ENERGY = SensorDeviceClass.ENERGY
     DEVICE_CLASS_ILLUMINANCE = SensorDeviceClass.ILLUMINANCE
     DEVICE_CLASS_POWER = SensorDeviceClass.POWER
@@ -23,6 +27,7 @@ except ImportError:
     from homeassistant.components.sensor import (
         DEVICE_CLASS_BATTERY, 
         DEVICE_CLASS_CURRENT, 
+        DEVICE_CLASS_DURATION, 
         DEVICE_CLASS_ENERGY, 
         DEVICE_CLASS_ILLUMINANCE, 
         DEVICE_CLASS_POWER, 
@@ -33,24 +38,33 @@ except ImportError:
 # Units
 from homeassistant.const import PERCENTAGE, SIGNAL_STRENGTH_DECIBELS_MILLIWATT, LIGHT_LUX
 try:
-    from homeassistant.const import UnitOfElectricCurrent, UnitOfElectricPotential, UnitOfEnergy, UnitOfPower
+    from homeassistant.const import UnitOfElectricCurrent, UnitOfElectricPotential, UnitOfEnergy, UnitOfPower, UnitOfTime
     ELECTRIC_CURRENT_MILLIAMPERE = UnitOfElectricCurrent.MILLIAMPERE
     ELECTRIC_POTENTIAL_VOLT = UnitOfElectricPotential.VOLT
     ENERGY_WATT_HOUR = UnitOfEnergy.WATT_HOUR
     POWER_WATT = UnitOfPower.WATT
+    TIME_MILLISECONDS = UnitOfTime.MILLISECONDS
+    TIME_SECONDS = UnitOfTime.SECONDS
 except ImportError:
-    from homeassistant.const import (POWER_WATT, ENERGY_WATT_HOUR, ELECTRIC_POTENTIAL_VOLT, ELECTRIC_CURRENT_MILLIAMPERE)
+    from homeassistant.const import (POWER_WATT, ENERGY_WATT_HOUR, ELECTRIC_POTENTIAL_VOLT, ELECTRIC_CURRENT_MILLIAMPERE,
+                                     TIME_MILLISECONDS, TIME_SECONDS)
 
 from homeassistant.core import callback
 from homeassistant.util import dt as dt_util
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.exceptions import ConfigEntryNotReady
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
 from .utils import (
     make_device_info,
-    get_extra_state_attributes
+    get_hub_id,
+    get_extra_state_attributes,
+    async_register_feature_callback,
+    async_schedule_state_write
 )
+from .reporting import LWRF2ReportingFilter, build_reporting_policies
 
 RECOMMENDED_LUX_LEVEL = 300
 
@@ -60,6 +74,43 @@ _LOGGER = logging.getLogger(__name__)
 
 SENSORS_PRIMARY_TYPES = ["energy"]
 
+# Other features a sensor's state is derived from, besides its own key
+SENSOR_FEATURE_DEPENDENCIES = {
+    "dawnTime": ("year", "month", "day"),
+    "duskTime": ("year", "month", "day"),
+}
+
+
+@lru_cache(maxsize=32)
+def sun_event_time(year, month, day, seconds):
+    """Return a dawn/dusk time, given as seconds after midnight UTC of a date, as a datetime (None if invalid)."""
+    try:
+        return datetime(year, month, day, tzinfo=dt_util.UTC) + timedelta(seconds=seconds)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+# Converters from a sensor's featureset features and key to its value, other sensors show the feature's state
+
+def lux_value(features, key):
+    # Very roughly adjust the given % to Lumens using 300 lux = 100%
+    value = features[key].state
+    return value / 100 * RECOMMENDED_LUX_LEVEL if value is not None else None
+
+
+def sun_event_value(features, key):
+    seconds = features[key].state
+    if seconds is None:
+        return None
+    return sun_event_time(features["year"].state, features["month"].state, features["day"].state, seconds)
+
+
+SENSOR_CONVERTERS = {
+    "lightLevel": lux_value,
+    "dawnTime": sun_event_value,
+    "duskTime": sun_event_value,
+}
+
 SENSORS_PRIMARY = [
     SensorEntityDescription(
         key="power",
@@ -157,28 +208,125 @@ SENSORS_DIAGNOSTIC = [
     )
 ]
 
+# Runtime counters of the integration itself, shown on the hub device. Keys are those of LWRF2Metrics.snapshot()
+SENSORS_METRICS = [
+    SensorEntityDescription(
+        key="events_per_second",
+        native_unit_of_measurement="events/s",
+        state_class=STATE_CLASS_MEASUREMENT,
+        name="Events Per Second",
+        icon="mdi:speedometer",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="events",
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        name="Events Received",
+        icon="mdi:counter",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="callbacks_dispatched",
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        name="Callbacks Dispatched",
+        icon="mdi:counter",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="state_writes",
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        name="State Writes",
+        icon="mdi:counter",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="command_rtt_p50",
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        device_class=DEVICE_CLASS_DURATION,
+        state_class=STATE_CLASS_MEASUREMENT,
+        name="Command Round Trip (median)",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="command_rtt_p95",
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        device_class=DEVICE_CLASS_DURATION,
+        state_class=STATE_CLASS_MEASUREMENT,
+        name="Command Round Trip (95th percentile)",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="reconnects",
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        name="Reconnects",
+        icon="mdi:connection",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="last_reconnect_duration",
+        native_unit_of_measurement=TIME_SECONDS,
+        device_class=DEVICE_CLASS_DURATION,
+        name="Last Reconnect Duration",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="last_resync_duration",
+        native_unit_of_measurement=TIME_SECONDS,
+        device_class=DEVICE_CLASS_DURATION,
+        name="Last Resync Duration",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+    SensorEntityDescription(
+        key="last_resync_changed",
+        name="Last Resync Changed Features",
+        icon="mdi:sync",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False
+    ),
+]
+
+SENSOR_RECONCILE = SensorEntityDescription(
+    key="reconcile_mismatches",
+    state_class=STATE_CLASS_TOTAL_INCREASING,
+    name="Reconciliation Mismatches",
+    icon="mdi:sync-alert",
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Find and return Lightwave sensors."""
 
     sensors = []
     link = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2]
+    discovery = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY]
 
-    for featureset_id, featureset in link.featuresets.items():
-        if featureset.primary_feature_type in SENSORS_PRIMARY_TYPES:
-            for description in SENSORS_PRIMARY:
-                if featureset.has_feature(description.key):
-                    sensors.append(LWRF2Sensor(featureset.name, featureset_id, link, description, hass))
-        else:
-            for description in SENSORS_SECONDARY:
-                if featureset.has_feature(description.key):
-                    sensors.append(LWRF2Sensor(featureset.name, featureset_id, link, description, hass))
-                
-        for description in SENSORS_DIAGNOSTIC:
-            if featureset.has_feature(description.key):
-                sensors.append(LWRF2Sensor(featureset.name, featureset_id, link, description, hass))
+    policies = build_reporting_policies(config_entry.options)
+
+    def is_primary(featureset_id):
+        return discovery.primary_types[featureset_id] in SENSORS_PRIMARY_TYPES
+
+    def is_secondary(featureset_id):
+        return not is_primary(featureset_id)
+
+    for featureset_id, name, description in (
+        discovery.pairs(SENSORS_PRIMARY, is_primary)
+        + discovery.pairs(SENSORS_SECONDARY, is_secondary)
+        + discovery.pairs(SENSORS_DIAGNOSTIC)
+    ):
+        sensors.append(LWRF2Sensor(name, featureset_id, link, description, hass, policies.get(description.key)))
     
 
-    for featureset_id, hubname in link.get_hubs():
+    event_interval = config_entry.options.get(CONF_EVENT_SENSOR_INTERVAL, DEFAULT_EVENT_SENSOR_INTERVAL)
+    for featureset_id, hubname in discovery.get("hub"):
         try:
             sensors.append(LWRF2EventSensor(hubname, featureset_id, link, SensorEntityDescription(
                 key="lastEvent",
@@ -186,49 +334,77 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                 name="Last Event Received",
                 entity_category=EntityCategory.DIAGNOSTIC,
                 entity_registry_enabled_default=False
-            ), hass))
+            ), hass, event_interval))
         except Exception as e: _LOGGER.exception("Could not add LWRF2EventSensor")
 
+
     hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_ENTITIES].extend(sensors)
     async_add_entities(sensors)
 
+    # The counters cover the whole entry, they go on the first hub. They have no featureset
+    # of their own, so they are kept out of LIGHTWAVE_ENTITIES.
+    metrics = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_METRICS]
+    for featureset_id, hubname in discovery.get("hub")[:1]:
+        descriptions = list(SENSORS_METRICS)
+        if LIGHTWAVE_RECONCILER in hass.data[DOMAIN][config_entry.entry_id]:
+            descriptions.append(SENSOR_RECONCILE)
+        snapshot = metrics.snapshot()
+        metric_sensors = [LWRF2MetricSensor(featureset_id, snapshot, description) for description in descriptions]
+        async_add_entities(metric_sensors)
+
+        @callback
+        def async_refresh_metrics(now=None):
+            # One snapshot per interval, shared by every metric sensor
+            snapshot = metrics.snapshot()
+            for sensor in metric_sensors:
+                sensor.async_set_snapshot(snapshot)
+
+        config_entry.async_on_unload(async_track_time_interval(
+            hass, async_refresh_metrics, timedelta(seconds=METRICS_INTERVAL)))
+
 class LWRF2Sensor(SensorEntity):
-    """Representation of a LightwaveRF sensor."""
+    """Representation of a LightwaveRF sensor.
+
+    The state is not copied into the entity, native_value derives it from the
+    link's Feature objects with a converter picked for the sensor key.
+    """
 
     _attr_has_entity_name = True
     _attr_should_poll = False
     _attr_assumed_state = False
 
-    def __init__(self, name, featureset_id, link, description, hass):
+    def __init__(self, name, featureset_id, link, description, hass, policy=None):
         _LOGGER.debug("Adding sensor: %s - %s - %s ", name, description.key, featureset_id)
         self._featureset_id = featureset_id
         self._lwlink = link
+        self._policy = policy if policy is not None and policy.is_active() else None
+        self._report_filter = None
 
-        for hub_featureset_id, hubname in self._lwlink.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
         
         self.entity_description = description
+        self._features = (self.entity_description.key,) + SENSOR_FEATURE_DEPENDENCIES.get(self.entity_description.key, ())
+        if self._lwlink.featuresets[self._featureset_id].has_feature("buttonPress"):
+            # Only to fire click events, a press writes no state unless this is the buttonPress sensor
+            self._features += ("buttonPress",)
+        self._convert = SENSOR_CONVERTERS.get(self.entity_description.key)
 
-        self._state = self._lwlink.featuresets[self._featureset_id].features[self.entity_description.key].state
-        if self._state is None:
+        if self._lwlink.featuresets[self._featureset_id].features[self.entity_description.key].state is None:
             _LOGGER.warning("LWRF2Sensor:__init__ - state is None for: %s - %s", self._featureset_id, self.entity_description.key)
-        else:
-            if self.entity_description.key == 'duskTime' or self.entity_description.key == 'dawnTime':
-                year = self._lwlink.featuresets[self._featureset_id].features['year'].state
-                month = self._lwlink.featuresets[self._featureset_id].features['month'].state
-                day = self._lwlink.featuresets[self._featureset_id].features['day'].state
-                hour = self._state // 3600
-                self._state = self._state - hour * 3600
-                min = self._state // 60
-                second = self._state - min * 60
-                self._state = dt_util.parse_datetime(f'{year}-{month:02}-{day:02}T{hour:02}:{min:02}:{second:02}Z')
 
         self._attr_unique_id = f"{self._featureset_id}_{self.entity_description.key}"
         self._attr_device_info = make_device_info(self, name)
 
     async def async_added_to_hass(self):
         """Subscribe to events."""
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
+        if self._policy is not None:
+            self._report_filter = LWRF2ReportingFilter(
+                self.hass, self._policy,
+                self._read_value,
+                lambda: async_schedule_state_write(self))
+            self._report_filter.set_published(self._read_value())
+            self.async_on_remove(self._report_filter.async_cancel)
+        await async_register_feature_callback(self, self._features)
 
     @callback
     def async_update_callback(self, **kwargs):
@@ -237,33 +413,27 @@ class LWRF2Sensor(SensorEntity):
             _LOGGER.debug("Button (light) press event: %s %s", self.entity_id, kwargs["new_value"])
             self.hass.bus.fire("lightwave_smart.click",{"entity_id": self.entity_id, "code": kwargs["new_value"]},
         )
-        self.async_schedule_update_ha_state(True)
-
-    async def async_update(self):
-        """Update state"""
-        self._state = self._lwlink.featuresets[self._featureset_id].features[self.entity_description.key].state
-        if self._state is None:
-            _LOGGER.warning("LWRF2Sensor:async_update - state is None for: %s - %s", self._featureset_id, self.entity_description.key)
-        else:
-            if self.entity_description.key == 'duskTime' or self.entity_description.key == 'dawnTime':
-                year = self._lwlink.featuresets[self._featureset_id].features['year'].state
-                month = self._lwlink.featuresets[self._featureset_id].features['month'].state
-                day = self._lwlink.featuresets[self._featureset_id].features['day'].state
-                hour = self._state // 3600
-                self._state = self._state - hour * 3600
-                min = self._state // 60
-                second = self._state - min * 60
-                self._state = dt_util.parse_datetime(f'{year}-{month:02}-{day:02}T{hour:02}:{min:02}:{second:02}Z')
+            if self.entity_description.key != "buttonPress":
+                return
+        if self._report_filter is not None and kwargs["feature"] == self.entity_description.key:
+            self._report_filter.async_offer()
+            return
+        async_schedule_state_write(self)
 
     @property
     def native_value(self):
-        value = self._state
-        if self.entity_description.key == 'lightLevel':
-            # Very roughly adjust the given % to Lumens using 300 lux = 100%
-            lux_level = (value / 100) * RECOMMENDED_LUX_LEVEL
-            value = lux_level
-        
-        return value
+        if self._report_filter is not None:
+            # Writes for other reasons (dependencies, update_states) must not show a held back value
+            return self._report_filter.value
+        if self._convert is None:
+            return self._lwlink.featuresets[self._featureset_id].features[self.entity_description.key].state
+        return self._read_value()
+
+    def _read_value(self):
+        features = self._lwlink.featuresets[self._featureset_id].features
+        if self._convert is None:
+            return features[self.entity_description.key].state
+        return self._convert(features, self.entity_description.key)
 
     @property
     def extra_state_attributes(self):
@@ -272,13 +442,18 @@ class LWRF2Sensor(SensorEntity):
 
 
 class LWRF2EventSensor(SensorEntity):
-    """Representation of a LightwaveRF sensor."""
+    """Representation of a LightwaveRF sensor.
+
+    Every event from every device counts, so the state (time of the last event)
+    is written at most once per interval seconds, with the number of events
+    received since the previous write as an attribute.
+    """
 
     _attr_has_entity_name = True
     _attr_should_poll = False
     _attr_assumed_state = False
 
-    def __init__(self, name, featureset_id, link, description, hass):
+    def __init__(self, name, featureset_id, link, description, hass, interval=DEFAULT_EVENT_SENSOR_INTERVAL):
         _LOGGER.debug("Adding event sensor: %s - %s - %s ", name, description.key, featureset_id)
         self._featureset_id = featureset_id
         self._lwlink = link
@@ -287,24 +462,79 @@ class LWRF2EventSensor(SensorEntity):
         self.entity_description = description
 
         self._state = datetime.now(pytz.utc)
+        self._interval = interval
+        self._last_event = self._state
+        self._events = 0
+        self._written = None
+        self._handle = None
+        self._attr_extra_state_attributes = {"events_in_window": 0, "window": interval}
 
         self._attr_unique_id = f"{self._featureset_id}_{self.entity_description.key}"
         self._attr_device_info = make_device_info(self, name)
 
     async def async_added_to_hass(self):
         """Subscribe to events."""
-        # This will be a noisy event, perhaps it should be a switchable option
         await self._lwlink.async_register_general_callback(self.async_update_callback)
+        self.async_on_remove(self._async_cancel)
 
     @callback
     def async_update_callback(self, **kwargs):
-        """Update the component's state."""
-        self.async_schedule_update_ha_state(True)
+        """Count the event, writing the state if the interval has passed since the last write."""
+        self._last_event = datetime.now(pytz.utc)
+        self._events += 1
+        if self._handle is not None or self.hass is None:
+            return
+        delay = 0 if self._written is None else self._written + self._interval - time.monotonic()
+        if delay <= 0:
+            self._async_write_window()
+        else:
+            self._handle = self.hass.loop.call_later(delay, self._async_write_window)
 
-    async def async_update(self):
-        """Update state"""
-        self._state = datetime.now(pytz.utc)
+    @callback
+    def _async_write_window(self):
+        self._handle = None
+        self._written = time.monotonic()
+        self._state = self._last_event
+        self._attr_extra_state_attributes = {"events_in_window": self._events, "window": self._interval}
+        self._events = 0
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        # The link has no call to unregister a general callback
+        callbacks = getattr(self._lwlink, "_callbacks", [])
+        if self.async_update_callback in callbacks:
+            callbacks.remove(self.async_update_callback)
+
+    @property
+    def native_value(self):
+        return self._state
+
+
+class LWRF2MetricSensor(SensorEntity):
+    """Representation of one of the integration's runtime counters."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(self, hub_featureset_id, snapshot, description):
+        _LOGGER.debug("Adding metric sensor: %s - %s ", description.key, hub_featureset_id)
+        self._snapshot = snapshot
+        self.entity_description = description
+
+        self._attr_unique_id = f"{hub_featureset_id}_metric_{description.key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, hub_featureset_id)})
+
+    @callback
+    def async_set_snapshot(self, snapshot):
+        """Show the counters of a new snapshot, refreshed periodically rather than on every event."""
+        self._snapshot = snapshot
+        if self.hass is not None:
+            self.async_write_ha_state()
 
     @property
     def native_value(self):
-        return self._state
\ No newline at end of file
+        return self._snapshot[self.entity_description.key]
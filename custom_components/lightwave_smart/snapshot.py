@@ -0,0 +1,98 @@
+import logging
+from homeassistant.helpers.storage import Store
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+def get_store(hass, entry_id):
+    """Return the store holding the last good hierarchy of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.hierarchy")
+
+
+def serialize_hierarchy(link):
+    """Return the link's hierarchy in the form the link reads it from the server.
+
+    Featuresets of the same physical device (same serial) are grouped under one
+    device so features that depend on their siblings (uiIOMap) restore correctly.
+    """
+    featuresets = []
+    devices = {}
+    features = {}
+    states = {}
+
+    for featureset_id, featureset in link.featuresets.items():
+        device_id = f"snapshot-{featureset.serial or featureset_id}"
+        device = devices.setdefault(device_id, {
+            "deviceId": device_id,
+            "productCode": featureset.product_code,
+            "virtualProductCode": featureset.virtual_product_code,
+            "firmwareVersion": featureset.firmware_version,
+            "manufacturerCode": featureset.manufacturer_code,
+            "serial": featureset.serial,
+            "featureIds": [],
+        })
+
+        primary_feature_id = None
+        feature_ids = []
+        for featurename, feature in featureset.features.items():
+            feature_ids.append(feature.id)
+            if feature.id not in features:
+                features[feature.id] = feature.lw_feature
+                device["featureIds"].append(feature.id)
+                states[feature.id] = feature.state
+            if featurename == featureset.primary_feature_type:
+                primary_feature_id = feature.id
+
+        item = {"groupId": featureset_id, "deviceId": device_id, "name": featureset.name, "features": feature_ids,
+                "primaryFeatureType": featureset.primary_feature_type}
+        if primary_feature_id is not None:
+            item["primaryFeatureId"] = primary_feature_id
+        featuresets.append(item)
+
+    for device in devices.values():
+        if device["virtualProductCode"] is None:
+            del device["virtualProductCode"]
+
+    return {
+        "featuresets": featuresets,
+        "devices": list(devices.values()),
+        "features": list(features.values()),
+        "states": states,
+    }
+
+
+def restore_hierarchy(link, data):
+    """Rebuild the link's featuresets and last known states from a snapshot."""
+    link.featuresets = {}
+    link.get_featuresets(data["featuresets"], data["devices"], data["features"])
+    # The link guesses a primary feature when there is none, keep what the server gave
+    for item in data["featuresets"]:
+        link.featuresets[item["groupId"]].primary_feature_type = item["primaryFeatureType"]
+    for feature_id, state in data["states"].items():
+        if feature_id in link.features:
+            link.features[feature_id].update_feature_state(state)
+
+
+def hierarchy_signature(link):
+    """Return what entity creation depends on, used to tell if a reload is needed."""
+    return {
+        featureset_id: (featureset.name, featureset.product_code, featureset.virtual_product_code,
+                        featureset.primary_feature_type, tuple(sorted(featureset.features)))
+        for featureset_id, featureset in link.featuresets.items()
+    }
+
+
+def get_feature_states(link):
+    """Return the current value of every feature of the link."""
+    return {feature_id: feature.state for feature_id, feature in link.features.items()}
+
+
+def copy_missing_states(features, link):
+    """Keep the last known value of features the link has no value for, e.g. after a failed read."""
+    for feature_id, feature in link.features.items():
+        previous = features.get(feature_id)
+        if feature.state is None and previous is not None and previous.state is not None:
+            feature.update_feature_state(previous.state)
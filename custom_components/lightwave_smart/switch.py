@@ -1,5 +1,5 @@
 import logging
-from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, CONF_HOMEKIT, DOMAIN
+from .const import LIGHTWAVE_LINK2, LIGHTWAVE_ENTITIES, LIGHTWAVE_DISCOVERY, CONF_HOMEKIT, DOMAIN
 from homeassistant.components.switch import (
     SwitchEntity,
     SwitchDeviceClass,
@@ -9,7 +9,12 @@ from homeassistant.helpers import entity_registry as er
 from homeassistant.core import callback
 from .utils import (
     make_device_info,
-    get_extra_state_attributes
+    get_hub_id,
+    get_extra_state_attributes,
+    async_register_feature_callback,
+    async_schedule_state_write,
+    async_write_optimistic,
+    get_feature_state
 )
 
 
@@ -34,14 +39,15 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     switches = []
     link = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_LINK2]
+    discovery = hass.data[DOMAIN][config_entry.entry_id][LIGHTWAVE_DISCOVERY]
 
     homekit = config_entry.options.get(CONF_HOMEKIT, False)
-    for featureset_id, name in link.get_switches():
+    for featureset_id, name in discovery.get("switch"):
         try:
             switches.append(LWRF2Switch(name, featureset_id, link, homekit, SWITCH))
         except Exception as e: _LOGGER.exception("Could not add switch LWRF2Switch")
 
-    for featureset_id, name in link.get_sockets():
+    for featureset_id, name in discovery.get("socket"):
         try:
             switches.append(LWRF2Switch(name, featureset_id, link, homekit, SOCKET))
         except Exception as e: _LOGGER.exception("Could not add socket LWRF2Switch")
@@ -60,10 +66,10 @@ class LWRF2Switch(SwitchEntity):
         self._featureset_id = featureset_id
         self._lwlink = link
 
-        for hub_featureset_id, hubname in self._lwlink.get_hubs():
-            self._linkid = hub_featureset_id
+        self._linkid = get_hub_id(self._lwlink, self._featureset_id)
 
         self.entity_description = description
+        self._features = ("switch", "uiButton")
 
         self._homekit = homekit
 
@@ -80,7 +86,7 @@ class LWRF2Switch(SwitchEntity):
 
     async def async_added_to_hass(self):
         """Subscribe to events."""
-        await self._lwlink.async_register_feature_callback(self._featureset_id, self.async_update_callback)
+        await async_register_feature_callback(self, self._features)
         registry = er.async_get(self.hass)
         entity_entry = registry.async_get(self.entity_id)
         if self._homekit and self._gen2:
@@ -99,12 +105,11 @@ class LWRF2Switch(SwitchEntity):
             _LOGGER.debug("Button (socket) press event: %s %s", self.entity_id, kwargs["new_value"])
             self.hass.bus.fire("lightwave_smart.click",{"entity_id": self.entity_id, "code": kwargs["new_value"]},
         )
-        self.async_schedule_update_ha_state(True)
+        async_schedule_state_write(self)
 
     async def async_update(self):
         """Update state"""
-        self._state = \
-            self._lwlink.featuresets[self._featureset_id].features["switch"].state
+        self._state = get_feature_state(self, "switch")
 
     @property
     def is_on(self):
@@ -114,13 +119,13 @@ class LWRF2Switch(SwitchEntity):
     async def async_turn_on(self, **kwargs):
         """Turn the Lightwave switch on."""
         self._state = True
-        await self._lwlink.async_turn_on_by_featureset_id(self._featureset_id)
+        await async_write_optimistic(self, [("switch", 1)])
         self.async_schedule_update_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the Lightwave switch off."""
         self._state = False
-        await self._lwlink.async_turn_off_by_featureset_id(self._featureset_id)
+        await async_write_optimistic(self, [("switch", 0)])
         self.async_schedule_update_ha_state()
 
     @property
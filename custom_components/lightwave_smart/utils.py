@@ -1,29 +1,167 @@
-from .const import DOMAIN
+import weakref
+from .const import DOMAIN, LIGHTWAVE_ROUTER, LIGHTWAVE_COALESCER, LIGHTWAVE_ATTRIBUTES, LIGHTWAVE_COMMANDS, \
+    LIGHTWAVE_OPTIMISTIC
+from .attributes import build_attributes
 from homeassistant.helpers.device_registry import DeviceInfo
 
+# Per link (featuresets dict the entries were built from, (featureset id, name, hub id) -> DeviceInfo)
+_DEVICE_INFOS = weakref.WeakKeyDictionary()
+
+
 def make_device_info(entity, name = None):
+    """Return the DeviceInfo of the entity's featureset, one shared (read-only) dict per device."""
+    name = name or entity.name
+    cached = _DEVICE_INFOS.get(entity._lwlink)
+    if cached is None or cached[0] is not entity._lwlink.featuresets:
+        cached = (entity._lwlink.featuresets, {})
+        _DEVICE_INFOS[entity._lwlink] = cached
+    key = (entity._featureset_id, name, entity._linkid)
+    device_info = cached[1].get(key)
+    if device_info is not None:
+        return device_info
+
     feature_set = entity._lwlink.featuresets[entity._featureset_id]
 
     product_code = feature_set.product_code
     if feature_set.virtual_product_code:
         product_code += "-" + feature_set.virtual_product_code
 
-    return DeviceInfo({
+    device_info = cached[1][key] = DeviceInfo({
         "identifiers": { (DOMAIN, entity._featureset_id) },
-        "name": name or entity.name,
+        "name": name,
         "manufacturer": feature_set.manufacturer_code,
         "model": product_code,
         "serial_number": feature_set.serial,
         "sw_version": feature_set.firmware_version,
-        "via_device": (DOMAIN, entity._linkid),
+        "via_device": (DOMAIN, entity._linkid) if entity._linkid is not None else None,
     })
+    return device_info
+
+
+# Per link (featuresets dict the index was built from, featureset id -> hub featureset id)
+_HUB_INDEXES = weakref.WeakKeyDictionary()
+
+
+def _link_key(featureset_id):
+    """Return the part of a featureset id naming the Link the device is paired to.
+
+    Featureset ids have the form <structure>-<device>-<link>+<channel>.
+    """
+    parts = featureset_id.split("+", 1)[0].split("-")
+    return parts[-1] if len(parts) >= 3 else None
+
+
+def build_hub_index(link):
+    """Map every featureset of the link to the featureset id of its parent hub."""
+    hubs = link.get_hubs()
+    default_hub = hubs[0][0] if hubs else None
+    hubs_by_key = {}
+    for hub_featureset_id, hubname in hubs:
+        hubs_by_key.setdefault(_link_key(hub_featureset_id), hub_featureset_id)
+
+    return {
+        featureset_id: hubs_by_key.get(_link_key(featureset_id), default_hub)
+        for featureset_id in link.featuresets
+    }
+
+
+def get_hub_id(link, featureset_id):
+    """Return the featureset id of the hub a featureset belongs to, or None if there is no hub."""
+    cached = _HUB_INDEXES.get(link)
+    # The link replaces its featuresets dict whenever the hierarchy is read
+    if cached is None or cached[0] is not link.featuresets:
+        cached = (link.featuresets, build_hub_index(link))
+        _HUB_INDEXES[link] = cached
+    return cached[1].get(featureset_id)
 
 
 def get_extra_state_attributes(entity):
     """Return the optional state attributes."""
-    feature_set = entity._lwlink.featuresets[entity._featureset_id]
+    if entity.hass is None or entity.platform is None:
+        return build_attributes(entity._lwlink.featuresets[entity._featureset_id])
+    return get_entry_data(entity)[LIGHTWAVE_ATTRIBUTES].get(entity._featureset_id)
+
+
+def get_entry_data(entity):
+    """Return the hass.data entry for the config entry that owns the entity."""
+    return entity.hass.data[DOMAIN][entity.platform.config_entry.entry_id]
+
+
+async def async_register_feature_callback(entity, features):
+    """Subscribe the entity's update callback to the features it depends on."""
+    router = get_entry_data(entity)[LIGHTWAVE_ROUTER]
+    unsubscribe = await router.async_subscribe(entity._featureset_id, features, entity.async_update_callback)
+    entity.async_on_remove(unsubscribe)
+
+
+def async_schedule_state_write(entity):
+    """Queue a refresh and state write of the entity with the entry's coalescer."""
+    get_entry_data(entity)[LIGHTWAVE_COALESCER].async_schedule(entity)
+
+
+async def async_write_entity_features(entity, writes):
+    """Write (feature name, value) pairs of the entity's featureset through the entry's command queue."""
+    features = entity._lwlink.featuresets[entity._featureset_id].features
+    await get_entry_data(entity)[LIGHTWAVE_COMMANDS].async_write(
+        entity._featureset_id, [(features[feature].id, value) for feature, value in writes])
+
+
+class LWRF2FeatureHandles:
+    """The Feature objects of a featureset an entity reads, resolved once.
+
+    get() returns them as a tuple in the order of names, None for a feature the
+    featureset does not have. The link replaces its featuresets dict (and the
+    Feature objects in it) whenever the hierarchy is read, so the tuple is
+    resolved again when that dict changes.
+    """
+
+    __slots__ = ("_lwlink", "_featureset_id", "_names", "_featuresets", "_features")
+
+    def __init__(self, link, featureset_id, names):
+        self._lwlink = link
+        self._featureset_id = featureset_id
+        self._names = tuple(names)
+        self._featuresets = None
+        self._features = None
+
+    def get(self):
+        """Return the Feature objects, in the order of names."""
+        if self._featuresets is not self._lwlink.featuresets:
+            self._featuresets = self._lwlink.featuresets
+            features = self._featuresets[self._featureset_id].features
+            self._features = tuple(features.get(name) for name in self._names)
+        return self._features
+
+
+def get_feature_state(entity, feature):
+    """Return the state of a feature of the entity, or the value written to it while unconfirmed."""
+    state = entity._lwlink.featuresets[entity._featureset_id].features[feature].state
+    return get_optimistic_state(entity, feature, state)
+
+
+def get_optimistic_state(entity, feature, state):
+    """Return the value written to a feature of the entity while unconfirmed, otherwise its reported state."""
+    if entity.hass is None or entity.platform is None:
+        return state
+    return get_entry_data(entity)[LIGHTWAVE_OPTIMISTIC].value(entity._featureset_id, feature, state)
+
+
+async def async_write_optimistic(entity, writes):
+    """Write (feature name, value) pairs, showing them until the device confirms or the write times out.
+
+    Entities with an assumed state get no confirmations, they are written as they always were.
+    """
+    if entity.assumed_state:
+        await async_write_entity_features(entity, writes)
+        return
 
-    attribs = {}
-    for featurename, feature in feature_set.features.items():
-        attribs['lwrf_' + featurename] = feature.state
-    return attribs
\ No newline at end of file
+    tracker = get_entry_data(entity)[LIGHTWAVE_OPTIMISTIC]
+    for feature, value in writes:
+        tracker.async_set(entity, feature, value)
+    entity.async_write_ha_state()
+    try:
+        await async_write_entity_features(entity, writes)
+    except Exception:
+        for feature, value in writes:
+            tracker.async_rollback(entity._featureset_id, feature)
+        raise
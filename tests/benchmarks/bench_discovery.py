@@ -0,0 +1,78 @@
+"""Compare the per-platform hierarchy scans with the single-pass LWRF2Discovery index.
+
+Run from the repository root: python tests/benchmarks/bench_discovery.py [devices]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from custom_components.lightwave_smart.binary_sensor import SENSORS as BINARY_SENSORS
+from custom_components.lightwave_smart.discovery import LWRF2Discovery
+from custom_components.lightwave_smart.sensor import (
+    SENSORS_DIAGNOSTIC, SENSORS_PRIMARY, SENSORS_PRIMARY_TYPES, SENSORS_SECONDARY,
+)
+from synthetic import make_link
+
+ROUNDS = 20
+
+
+def scan(link):
+    """What the platforms did before: one walk of the hierarchy per question."""
+    found = []
+    found += link.get_switches()
+    found += link.get_sockets()
+    found += link.get_lights()
+    found += [x for x in link.get_lights() if link.featuresets[x[0]].has_led()]
+    found += [x for x in link.get_sockets() if link.featuresets[x[0]].has_led()]
+    found += [x for x in link.get_hubs() if link.featuresets[x[0]].has_led()]
+    found += link.get_climates()
+    found += link.get_covers()
+    found += link.get_with_feature("protection")
+    found += link.get_uiButtonPair_producers()
+    found += link.get_uiButton_producers()
+    found += link.get_hubs()
+    for featureset_id, featureset in link.featuresets.items():
+        descriptions = SENSORS_PRIMARY if featureset.primary_feature_type in SENSORS_PRIMARY_TYPES else SENSORS_SECONDARY
+        for description in list(descriptions) + list(SENSORS_DIAGNOSTIC) + list(BINARY_SENSORS):
+            if featureset.has_feature(description.key):
+                found.append((featureset_id, description.key))
+    return found
+
+
+def index(link):
+    """The same questions answered from a single LWRF2Discovery pass."""
+    discovery = LWRF2Discovery(link)
+    found = []
+    for kind in ("switch", "socket", "light"):
+        found += discovery.get(kind)
+    for kind in ("light", "socket", "hub"):
+        found += [x for x in discovery.get(kind) if discovery.is_kind(x[0], "led")]
+    found += discovery.get("climate")
+    found += discovery.get("cover")
+    found += discovery.with_feature("protection")
+    found += discovery.get("uiButtonPair_producer")
+    found += discovery.get("uiButton_producer")
+    found += discovery.get("hub")
+    is_primary = lambda featureset_id: discovery.primary_types[featureset_id] in SENSORS_PRIMARY_TYPES
+    found += discovery.pairs(SENSORS_PRIMARY, is_primary)
+    found += discovery.pairs(SENSORS_SECONDARY, lambda featureset_id: not is_primary(featureset_id))
+    found += discovery.pairs(SENSORS_DIAGNOSTIC)
+    found += discovery.pairs(BINARY_SENSORS)
+    return found
+
+
+def main():
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    link = make_link(devices)
+    assert len(scan(link)) == len(index(link))
+
+    for name, func in (("scan", scan), ("discovery", index)):
+        elapsed = timeit.timeit(lambda: func(link), number=ROUNDS) / ROUNDS
+        print(f"{name:>10}: {elapsed * 1000:8.2f} ms for {len(link.featuresets)} featuresets")
+
+
+if __name__ == "__main__":
+    main()
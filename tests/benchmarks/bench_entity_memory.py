@@ -0,0 +1,67 @@
+"""Measure the memory each entity class allocates, over a synthetic hierarchy.
+
+Entities are constructed directly (no Home Assistant core), a fixed sample of
+the given number of entities from those the platforms would create for a
+synthetic hierarchy, so the numbers are the integration's own per-entity cost
+with Home Assistant's state machine and registries left out.
+
+Run from the repository root: python tests/benchmarks/bench_entity_memory.py [entities]
+"""
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from custom_components.lightwave_smart.binary_sensor import SENSORS as BINARY_SENSORS, LWRF2BinarySensor
+from custom_components.lightwave_smart.climate import LWRF2Climate
+from custom_components.lightwave_smart.discovery import LWRF2Discovery
+from custom_components.lightwave_smart.light import LWRF2LED, LWRF2Light, LED
+from custom_components.lightwave_smart.sensor import SENSORS_DIAGNOSTIC, SENSORS_SECONDARY, LWRF2Sensor
+from synthetic import make_link
+
+
+def build(link, discovery):
+    """Return (class name, factory) for every entity the platforms would create."""
+    factories = []
+    for featureset_id, name, description in discovery.pairs(SENSORS_SECONDARY) + discovery.pairs(SENSORS_DIAGNOSTIC):
+        factories.append(("LWRF2Sensor", lambda f=featureset_id, n=name, d=description: LWRF2Sensor(n, f, link, d, None)))
+    for featureset_id, name, description in discovery.pairs(BINARY_SENSORS):
+        factories.append(("LWRF2BinarySensor", lambda f=featureset_id, n=name, d=description: LWRF2BinarySensor(n, f, link, d, False)))
+    for featureset_id, name in discovery.get("light"):
+        factories.append(("LWRF2Light", lambda f=featureset_id, n=name: LWRF2Light(n, f, link, False)))
+        factories.append(("LWRF2LED", lambda f=featureset_id, n=name: LWRF2LED(n, f, link, LED)))
+    for featureset_id, name in discovery.get("climate"):
+        factories.append(("LWRF2Climate", lambda f=featureset_id, n=name: LWRF2Climate(n, f, link)))
+    return factories
+
+
+def main():
+    entities = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    # About 3.6 entities per synthetic device
+    link = make_link(entities // 3 + 1)
+    factories = build(link, LWRF2Discovery(link))
+    factories = random.Random(0).sample(factories, min(entities, len(factories)))
+
+    totals = {}
+    entities = []
+    gc.collect()
+    tracemalloc.start()
+    for cls, factory in factories:
+        before = tracemalloc.get_traced_memory()[0]
+        entities.append(factory())
+        size, count = totals.get(cls, (0, 0))
+        totals[cls] = (size + tracemalloc.get_traced_memory()[0] - before, count + 1)
+    tracemalloc.stop()
+
+    all_bytes = sum(size for size, count in totals.values())
+    for cls, (size, count) in sorted(totals.items()):
+        print(f"{cls:>18}: {count:6} entities {size / count:8.0f} bytes each")
+    print(f"{'total':>18}: {len(entities):6} entities {all_bytes / len(entities):8.0f} bytes each, {all_bytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
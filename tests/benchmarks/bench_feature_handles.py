@@ -0,0 +1,141 @@
+"""Compare entity updates through nested featureset lookups with updates through bound feature handles.
+
+The "lookup" functions are LWRF2Climate, LWRF2Light and LWRF2Sensor.async_update as they
+were before feature handles; "handles" runs the entities' current async_update (for the
+sensor, which keeps a plain lookup, the read-through native_value). Each case is timed in
+interleaved repeats and the best repeat is reported, the machine's noise only adds time.
+
+Run from the repository root: python tests/benchmarks/bench_feature_handles.py [rounds]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from custom_components.lightwave_smart.climate import LWRF2Climate
+from custom_components.lightwave_smart.light import LWRF2Light
+from custom_components.lightwave_smart.sensor import SENSORS_DIAGNOSTIC, SENSOR_FEATURE_DEPENDENCIES, LWRF2Sensor, \
+    sun_event_time
+from custom_components.lightwave_smart.utils import get_feature_state
+from synthetic import DEVICE_TYPES, add_featureset, make_link
+
+
+async def climate_lookup(self):
+    self._valve_level = 100
+    if 'valveLevel' in self._lwlink.featuresets[self._featureset_id].features.keys():
+        self._valve_level = self._lwlink.featuresets[self._featureset_id].features["valveLevel"].state
+    elif self._thermostat:
+        if "callForHeat" in self._lwlink.featuresets[self._featureset_id].features:
+            if self._lwlink.featuresets[self._featureset_id].features["callForHeat"].state is None:
+                self._valve_level = 0
+            else:
+                self._valve_level = \
+                    self._lwlink.featuresets[self._featureset_id].features["callForHeat"].state * 100
+
+    if self._thermostat:
+        self._onoff = 1
+    else:
+        self._onoff = \
+            self._lwlink.featuresets[self._featureset_id].features["heatState"].state
+
+    self._temperature = \
+        self._lwlink.featuresets[self._featureset_id].features["temperature"].state / 10
+
+    self._target_temperature = self._lwlink.featuresets[self._featureset_id].features["targetTemperature"].state
+    self._target_temperature = self._target_temperature / 10 if self._target_temperature is not None else None
+
+    if self._valve_level == 100 and (self._target_temperature is None or self._target_temperature < 40):
+        self._preset_mode = "Auto"
+        self._last_tt = self._target_temperature
+
+    if self._has_humidity:
+        self._humidity = \
+            self._lwlink.featuresets[self._featureset_id].features["humidity"].state
+        self._target_humidity = \
+            self._lwlink.featuresets[self._featureset_id].features["targetHumidity"].state
+
+    elif self._valve_level == 100:
+        self._preset_mode = "100%"
+    elif self._valve_level == 80:
+        self._preset_mode = "80%"
+    elif self._valve_level == 60:
+        self._preset_mode = "60%"
+    elif self._valve_level == 40:
+        self._preset_mode = "40%"
+    elif self._valve_level == 20:
+        self._preset_mode = "20%"
+    else:
+        self._preset_mode = "Auto"
+
+
+async def light_lookup(self):
+    self._state = get_feature_state(self, "switch")
+    dimLevel = get_feature_state(self, "dimLevel")
+    self._brightness = int(round(dimLevel / 100 * 255)) if dimLevel is not None else None
+
+
+class LookupSensor(LWRF2Sensor):
+    """LWRF2Sensor with the native_value it had before, reading the state async_update stored."""
+
+    @property
+    def native_value(self):
+        value = self._state
+        if self.entity_description.key == 'lightLevel':
+            value = (value / 100) * 300
+        return value
+
+
+async def sensor_lookup(self):
+    features = self._lwlink.featuresets[self._featureset_id].features
+    state = features[self.entity_description.key].state
+    if state is None:
+        pass
+    elif self.entity_description.key in SENSOR_FEATURE_DEPENDENCIES:
+        state = sun_event_time(features['year'].state, features['month'].state, features['day'].state, state)
+    self._state = state
+    # The state write that follows reads native_value
+    self.native_value
+
+
+async def sensor_handles(self):
+    # The sensor has no async_update any more, its state is read through when written
+    self.native_value
+
+
+def run(coroutine_function, entity):
+    def update():
+        try:
+            coroutine_function(entity).send(None)
+        except StopIteration:
+            pass
+    return update
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeats = 15
+    link = make_link(10)
+    add_featureset(link, "bench-trv", "TRV", *DEVICE_TYPES["trv"])
+    add_featureset(link, "bench-dimmer", "Dimmer", *DEVICE_TYPES["dimmer"])
+    rssi = next(description for description in SENSORS_DIAGNOSTIC if description.key == "rssi")
+
+    climate = LWRF2Climate("TRV", "bench-trv", link)
+    light = LWRF2Light("Dimmer", "bench-dimmer", link, False)
+    cases = (
+        ("climate", climate, climate_lookup, climate, LWRF2Climate.async_update),
+        ("light", light, light_lookup, light, LWRF2Light.async_update),
+        ("sensor", LookupSensor("Dimmer", "bench-dimmer", link, rssi, None), sensor_lookup,
+         LWRF2Sensor("Dimmer", "bench-dimmer", link, rssi, None), sensor_handles),
+    )
+    for name, lookup_entity, lookup, entity, async_update in cases:
+        before = after = float("inf")
+        for _ in range(repeats):
+            before = min(before, timeit.timeit(run(lookup, lookup_entity), number=rounds) / rounds)
+            after = min(after, timeit.timeit(run(async_update, entity), number=rounds) / rounds)
+        print(f"{name:>8}: lookups {before * 1e9:7.0f} ns  handles {after * 1e9:7.0f} ns  ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Measure the integration's hot paths on synthetic hierarchies and write the results as JSON.
+
+Run from the repository root:
+
+    python tests/benchmarks/bench_integration.py --devices 10 100 1000 2000 --output results.json
+
+Compare two result files with compare.py.
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from harness import DOMAIN, ROOT, async_running_integration
+
+from custom_components.lightwave_smart.const import LIGHTWAVE_ENTITIES, LIGHTWAVE_TIMINGS
+
+# Features whose events are replayed, each maps to the entity that shows it
+EVENT_FEATURES = ("power", "switch", "dimLevel", "temperature", "movement", "threeWayRelay")
+
+
+def event_features(link, count):
+    """Return count (feature_id, featureset_id) pairs spread over the hierarchy."""
+    candidates = [
+        feature.id for featureset in link.featuresets.values()
+        for name, feature in featureset.features.items() if name in EVENT_FEATURES
+    ]
+    step = max(1, len(candidates) // count)
+    return [candidates[(i * step) % len(candidates)] for i in range(count)]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+async def async_measure_events(hass, link, events):
+    """Return callback-to-state-write latencies and state writes per event, one event at a time."""
+    state_writes = 0
+    waiter = None
+
+    def state_changed(event):
+        nonlocal state_writes
+        state_writes += 1
+        if waiter is not None and not waiter.done():
+            waiter.set_result(time.perf_counter())
+
+    unsubscribe = hass.bus.async_listen("state_changed", state_changed)
+    latencies = []
+    writes = []
+    for i, feature_id in enumerate(event_features(link, events)):
+        waiter = hass.loop.create_future()
+        state_writes = 0
+        started = time.perf_counter()
+        await link.emit(feature_id, 1000 + i)
+        try:
+            latencies.append(await asyncio.wait_for(waiter, 1) - started)
+        except asyncio.TimeoutError:
+            pass
+        await hass.async_block_till_done()
+        writes.append(state_writes)
+    unsubscribe()
+    return latencies, writes
+
+
+async def async_measure_burst(hass, link, events):
+    """Return state writes per event when events arrive back to back."""
+    state_writes = 0
+
+    def state_changed(event):
+        nonlocal state_writes
+        state_writes += 1
+
+    unsubscribe = hass.bus.async_listen("state_changed", state_changed)
+    for i, feature_id in enumerate(event_features(link, events)):
+        await link.emit(feature_id, 5000 + i)
+    await hass.async_block_till_done()
+    unsubscribe()
+    return state_writes / events
+
+
+async def async_run(devices, events, options):
+    """Return the timing and write metrics of one hierarchy size."""
+    started = time.perf_counter()
+    async with async_running_integration(devices, options) as (hass, entry, link):
+        setup = time.perf_counter() - started
+        entry_data = hass.data[DOMAIN][entry.entry_id]
+        entities = len(entry_data[LIGHTWAVE_ENTITIES])
+        latencies, writes = await async_measure_events(hass, link, events)
+        burst = await async_measure_burst(hass, link, events)
+        return {
+            "devices": devices,
+            "featuresets": len(link.featuresets),
+            "entities": entities,
+            "setup_s": round(setup, 4),
+            "setup_timings_s": {name: round(value, 4) for name, value in entry_data[LIGHTWAVE_TIMINGS].items()},
+            "event_latency_ms": {
+                "mean": round(statistics.mean(latencies) * 1000, 3),
+                "p50": round(percentile(latencies, 0.5) * 1000, 3),
+                "p95": round(percentile(latencies, 0.95) * 1000, 3),
+                "missed": events - len(latencies),
+            },
+            "state_writes_per_event": round(statistics.mean(writes), 3),
+            "burst_state_writes_per_event": round(burst, 3),
+        }
+
+
+async def async_run_memory(devices, options):
+    """Return the memory allocated by setting up the integration, per entity."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    async with async_running_integration(devices, options) as (hass, entry, link):
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        entities = len(hass.data[DOMAIN][entry.entry_id][LIGHTWAVE_ENTITIES])
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {"memory_bytes": allocated, "memory_per_entity_bytes": round(allocated / max(entities, 1))}
+
+
+def environment():
+    """Return what the results depend on besides the hierarchy size."""
+    from homeassistant.const import __version__ as ha_version
+    from importlib.metadata import version
+
+    with open(os.path.join(ROOT, "custom_components", "lightwave_smart", "manifest.json")) as manifest:
+        integration_version = json.load(manifest)["version"]
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "integration": integration_version,
+        "revision": revision,
+        "homeassistant": ha_version,
+        "lightwave_smart": version("lightwave_smart"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100, 500, 1000, 2000])
+    parser.add_argument("--events", type=int, default=200, help="feature events replayed per size")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slow) tracemalloc pass")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=JSON",
+                        help="config entry option, e.g. lightwave_write_window=0.05")
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    options = {}
+    for option in args.option:
+        key, value = option.split("=", 1)
+        options[key] = json.loads(value)
+
+    runs = []
+    for devices in args.devices:
+        result = asyncio.run(async_run(devices, args.events, options))
+        if not args.no_memory:
+            result.update(asyncio.run(async_run_memory(devices, options)))
+        print(f"{devices:>5} devices: {result['entities']:>6} entities, setup {result['setup_s']:.2f} s, "
+              f"event p50 {result['event_latency_ms']['p50']:.2f} ms, "
+              f"{result['state_writes_per_event']:.2f} writes/event, "
+              f"{result['burst_state_writes_per_event']:.2f} writes/event in bursts"
+              + (f", {result['memory_per_entity_bytes']} B/entity" if "memory_per_entity_bytes" in result else ""))
+        runs.append(result)
+
+    with open(args.output, "w") as output:
+        json.dump({
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "environment": environment(),
+            "options": options,
+            "events": args.events,
+            "runs": runs,
+        }, output, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
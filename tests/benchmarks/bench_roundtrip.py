@@ -0,0 +1,148 @@
+"""End-to-end latency and throughput of the integration against the local stand-in server.
+
+The real LWLink2 talks to standin_server.py over a loopback websocket, so
+this covers the protocol, the library and the integration together.
+
+    python tests/benchmarks/bench_roundtrip.py --devices 200 --latency 0.05 --events-per-second 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from harness import async_running_integration
+
+from custom_components.lightwave_smart.const import CONF_SERVER_URL
+from standin_server import StandinServer
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    pick = lambda fraction: values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+    return {"mean": round(statistics.mean(values) * 1000, 3), "p50": round(pick(0.5) * 1000, 3),
+            "p95": round(pick(0.95) * 1000, 3), "count": len(values)}
+
+
+async def async_measure_commands(hass, link, commands):
+    """Time light commands: service call return (write acknowledged) and the device's event arriving."""
+    lights = [state.entity_id for state in hass.states.async_all("light") if state.entity_id.endswith("_switch")]
+    acknowledged, confirmed = [], []
+    waiters = {}
+
+    def feature_callback(feature_id, new_value, **kwargs):
+        waiter = waiters.pop((feature_id, new_value), None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(time.perf_counter())
+
+    await link.async_register_general_callback(feature_callback)
+    for i in range(commands):
+        entity_id = lights[i % len(lights)]
+        registry_entry = hass.data["entity_registry"].async_get(entity_id)
+        featureset_id = registry_entry.unique_id.rsplit("_", 1)[0]
+        brightness = 1 + (i % 99)
+        waiter = waiters[(link.featuresets[featureset_id].features["dimLevel"].id, brightness)] = hass.loop.create_future()
+        started = time.perf_counter()
+        await hass.services.async_call("light", "turn_on", {"entity_id": entity_id, "brightness": round(brightness * 255 / 100)}, blocking=True)
+        acknowledged.append(time.perf_counter() - started)
+        try:
+            confirmed.append(await asyncio.wait_for(waiter, 5) - started)
+        except asyncio.TimeoutError:
+            pass
+    return percentiles(acknowledged), percentiles(confirmed)
+
+
+async def async_measure_events(hass, link, server, seconds, events_per_second):
+    """Run the server's event generator and time each event from push to state write."""
+    latencies = []
+    state_writes = 0
+
+    def feature_callback(feature_id, new_value, **kwargs):
+        sent = server.event_times.pop((feature_id, new_value), None)
+        if sent is not None:
+            latencies.append(time.perf_counter() - sent)
+
+    def state_changed(event):
+        nonlocal state_writes
+        state_writes += 1
+
+    await link.async_register_general_callback(feature_callback)
+    unsubscribe = hass.bus.async_listen("state_changed", state_changed)
+    pushed = server.stats["events"]
+    server.event_times.clear()
+    server.events_per_second = events_per_second
+    await asyncio.sleep(seconds)
+    server.events_per_second = 0
+    await hass.async_block_till_done()
+    unsubscribe()
+    pushed = server.stats["events"] - pushed
+    return {
+        "pushed": pushed,
+        "received": len(latencies),
+        "events_per_second": round(len(latencies) / seconds, 1),
+        "state_writes": state_writes,
+        "push_to_callback_ms": percentiles(latencies),
+    }
+
+
+async def async_measure_reconnect(hass, link, server):
+    """Drop the connection and time the next command, which reconnects first."""
+    lights = [state.entity_id for state in hass.states.async_all("light") if state.entity_id.endswith("_switch")]
+    connections = server.stats["connections"]
+    await server.async_disconnect_all()
+    await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    await hass.services.async_call("light", "turn_off", {"entity_id": lights[0]}, blocking=True)
+    return {"reconnected": server.stats["connections"] > connections,
+            "first_command_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+
+async def async_run(args):
+    server = StandinServer(args.devices, args.latency)
+    url = await server.async_start(port=0)
+    try:
+        started = time.perf_counter()
+        async with async_running_integration(args.devices, {CONF_SERVER_URL: url}, fake=False) as (hass, entry, link):
+            setup = time.perf_counter() - started
+            acknowledged, confirmed = await async_measure_commands(hass, link, args.commands)
+            events = await async_measure_events(hass, link, server, args.seconds, args.events_per_second)
+            reconnect = await async_measure_reconnect(hass, link, server)
+    finally:
+        await server.async_stop()
+    return {
+        "devices": args.devices,
+        "latency_s": args.latency,
+        "setup_s": round(setup, 3),
+        "command_acknowledged_ms": acknowledged,
+        "command_confirmed_ms": confirmed,
+        "events": events,
+        "reconnect": reconnect,
+        "server": server.stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="server reply delay in seconds")
+    parser.add_argument("--commands", type=int, default=50)
+    parser.add_argument("--events-per-second", type=float, default=200)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    result = asyncio.run(async_run(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
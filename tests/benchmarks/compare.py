@@ -0,0 +1,38 @@
+"""Compare two bench_integration.py result files.
+
+    python tests/benchmarks/compare.py old.json new.json
+"""
+import json
+import sys
+
+METRICS = (
+    ("setup_s", lambda run: run["setup_s"]),
+    ("event p50 ms", lambda run: run["event_latency_ms"]["p50"]),
+    ("event p95 ms", lambda run: run["event_latency_ms"]["p95"]),
+    ("writes/event", lambda run: run["state_writes_per_event"]),
+    ("burst writes/event", lambda run: run["burst_state_writes_per_event"]),
+    ("bytes/entity", lambda run: run.get("memory_per_entity_bytes")),
+)
+
+
+def main():
+    with open(sys.argv[1]) as old_file, open(sys.argv[2]) as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    print(f"old: {old['environment']}\nnew: {new['environment']}\n")
+
+    old_runs = {run["devices"]: run for run in old["runs"]}
+    for run in new["runs"]:
+        previous = old_runs.get(run["devices"])
+        if previous is None:
+            continue
+        print(f"{run['devices']} devices")
+        for name, metric in METRICS:
+            before, after = metric(previous), metric(run)
+            if before is None or after is None:
+                continue
+            change = f"{(after - before) / before * 100:+.1f}%" if before else ""
+            print(f"  {name:<20} {before:>12} {after:>12} {change:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""In-process stand-in for lightwave_smart.LWLink2, nothing leaves the process."""
+import asyncio
+
+from lightwave_smart import lightwave_smart as lw
+
+from synthetic import build_hierarchy
+
+
+class FakeWebsocket:
+    """Answers feature write messages the way the server does, after an optional delay."""
+
+    def __init__(self, link):
+        self._link = link
+        self._websocket = None
+        self.messages = 0
+
+    async def _async_sendmessage(self, message, *args, **kwargs):
+        self.messages += 1
+        items = message._message["items"]
+        if message._message["operation"] == "write":
+            for item in items:
+                self._link.writes.append((item["payload"]["featureId"], item["payload"]["value"]))
+        if self._link.latency:
+            await asyncio.sleep(self._link.latency)
+        return [{"itemId": item["itemId"], "success": True} for item in items]
+
+
+class FakeLWLink2(lw.LWLink2):
+    """LWLink2 holding a synthetic hierarchy of the given number of devices.
+
+    Connection and reads are answered locally, writes are recorded in writes,
+    and emit() pushes a feature event through the link's own event handler.
+    """
+
+    def __init__(self, devices, latency=0):
+        # LWLink2.__init__ opens an aiohttp session, set up what the integration uses instead
+        self.featuresets = {}
+        self.features = {}
+        self._group_ids = []
+        self._callbacks = []
+        self._feature_set_event_callbacks = {}
+        self._ws = FakeWebsocket(self)
+
+        self.devices = devices
+        self.latency = latency
+        self.writes = []
+
+    async def async_connect(self, max_tries=5, force_keep_alive_secs=0):
+        return True
+
+    async def async_get_hierarchy(self):
+        build_hierarchy(self, self.devices)
+
+    async def async_update_featureset_states(self):
+        pass
+
+    async def async_write_feature(self, feature_id, value):
+        self.writes.append((feature_id, value))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def async_read_feature(self, feature_id):
+        return [{"itemId": 0, "success": True, "payload": {"value": self.features[feature_id].state}}]
+
+    async def emit(self, feature_id, value):
+        """Deliver a feature event as the server would."""
+        await self._feature_event_handler({"items": [{"payload": {"featureId": feature_id, "value": value}}]})
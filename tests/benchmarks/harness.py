@@ -0,0 +1,67 @@
+"""Boot a bare Home Assistant core with the integration set up against a FakeLWLink2."""
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+from homeassistant import config_entries, loader
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry, device_registry, entity, entity_registry, issue_registry, restore_state
+from homeassistant.setup import async_setup_component
+from lightwave_smart import lightwave_smart as lw
+
+from custom_components.lightwave_smart.const import LIGHTWAVE_LINK2
+
+from fake_link import FakeLWLink2
+
+DOMAIN = "lightwave_smart"
+
+
+@contextlib.asynccontextmanager
+async def async_running_integration(devices, options=None, latency=0, fake=True):
+    """Yield (hass, entry, link) with the integration set up on a synthetic hierarchy.
+
+    With fake=False the real LWLink2 is used, pointed at a server by the entry's options.
+    """
+    logging.getLogger("homeassistant").setLevel(logging.ERROR)
+    logging.getLogger("custom_components").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config.skip_pip = True
+        if hasattr(loader, "async_setup"):
+            loader.async_setup(hass)
+        entity.async_setup(hass)
+        await restore_state.async_load(hass)
+        await area_registry.async_load(hass)
+        await device_registry.async_load(hass)
+        await entity_registry.async_load(hass)
+        await issue_registry.async_load(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        await async_setup_component(hass, "homeassistant", {})
+
+        link = FakeLWLink2(devices, latency) if fake else None
+        with patch.object(lw, "LWLink2", lambda *args, **kwargs: link) if fake else contextlib.nullcontext():
+            entry = config_entries.ConfigEntry(
+                entry_id="benchmark", version=1, minor_version=1, domain=DOMAIN, title="benchmark",
+                data={"username": "benchmark", "password": "benchmark"}, source="user", options=options or {})
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            if link is None:
+                link = hass.data[DOMAIN][entry.entry_id][LIGHTWAVE_LINK2]
+            try:
+                yield hass, entry, link
+            finally:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(hass.async_stop(force=True), 10)
+                if not fake:
+                    for task in link._ws.background_tasks:
+                        task.cancel()
+                    await link._ws._session.close()
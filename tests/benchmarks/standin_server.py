@@ -0,0 +1,299 @@
+"""Local stand-in for the Lightwave auth server and LWLink2 websocket API.
+
+Speaks the subset of the protocol the integration uses: username login, user
+authenticate, root groups, group hierarchy/read, feature read/write and
+feature event push. It also generates load: feature events at a fixed rate,
+injected response latency and periodic disconnects.
+
+    python tests/benchmarks/standin_server.py --devices 200 --events-per-second 20 --latency 0.05
+
+then set the integration's stand-in server option to http://127.0.0.1:8765.
+Settings can be changed while running:
+
+    curl -X POST localhost:8765/control -d '{"events_per_second": 100, "latency": 0.2}'
+    curl -X POST localhost:8765/control/disconnect
+    curl localhost:8765/stats
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+from aiohttp import WSMsgType, web
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from synthetic import DEVICE_TYPES
+
+_LOGGER = logging.getLogger(__name__)
+
+ROOT_GROUP = "standin-root"
+AUTH_PATH = "/v2/lightwaverf/autouserlogin/lwapps"
+
+# Values events are drawn from, per feature type, TOGGLED_FEATURES flip between 0 and 1.
+# Other features (dates, buttons, setup) never change on their own.
+EVENT_VALUES = {
+    "power": range(0, 3000),
+    "energy": range(0, 100000),
+    "dimLevel": range(0, 101),
+    "temperature": range(150, 250),
+    "rssi": range(-90, -40),
+    "lightLevel": range(0, 1000),
+    "voltage": range(230, 250),
+    "current": range(0, 130),
+}
+TOGGLED_FEATURES = ("switch", "movement", "outletInUse", "heatState", "protection")
+
+
+class StandinServer:
+    """Serve a synthetic hierarchy of the given number of devices over the LWLink2 protocol."""
+
+    def __init__(self, devices, latency=0.0, events_per_second=0.0, disconnect_every=0.0, seed=0):
+        self.latency = latency
+        self.events_per_second = events_per_second
+        self.disconnect_every = disconnect_every
+
+        self._random = random.Random(seed)
+        self._transactions = itertools.count(1)
+        self._clients = set()
+        self._tasks = []
+        self._runner = None
+
+        self.stats = {"connections": 0, "disconnects": 0, "messages": 0, "writes": 0, "events": 0}
+        # (feature_id, value) -> time.perf_counter() the event was pushed, for in-process latency measurements
+        self.event_times = {}
+
+        self._build(devices)
+
+    def _build(self, devices):
+        self.featuresets = []
+        self.devices = {}
+        self.features = {}
+        self.states = {}
+
+        hub = ("L2", {"buttonPress": 0, "rgbColor": 0, "dawnTime": 25000, "duskTime": 70000, "year": 2024,
+                      "month": 5, "day": 3, "upgrade": 0, "rssi": -50})
+        types = list(DEVICE_TYPES)
+        for i in range(devices + 1):
+            if i == 0:
+                name, (product_code, values) = "Link", hub
+            else:
+                device_type = types[(i - 1) % len(types)]
+                name, (product_code, values) = f"{device_type} {i - 1}", DEVICE_TYPES[device_type]
+            featureset_id = f"s-{i + 1}-100+1"
+            device_id = f"d-{i + 1}"
+            feature_ids = []
+            for feature_type, value in values.items():
+                feature_id = f"{featureset_id}/{feature_type}"
+                self.features[feature_id] = {"featureId": feature_id, "attributes": {"type": feature_type, "channel": 0}}
+                self.states[feature_id] = value
+                feature_ids.append(feature_id)
+            primary = next(iter(values))
+            self.devices[device_id] = {"deviceId": device_id, "productCode": product_code, "firmwareVersion": "1",
+                                       "manufacturerCode": "LW", "serial": featureset_id, "featureIds": feature_ids}
+            self.featuresets.append({"groupId": featureset_id, "deviceId": device_id, "name": name,
+                                     "features": feature_ids, "primaryFeatureId": f"{featureset_id}/{primary}"})
+
+        self._event_features = [
+            feature_id for feature_id, feature in self.features.items()
+            if feature["attributes"]["type"] in EVENT_VALUES or feature["attributes"]["type"] in TOGGLED_FEATURES
+        ]
+
+    # HTTP
+
+    async def _handle_auth(self, request):
+        body = await request.json()
+        if not body.get("email"):
+            return web.json_response({"message": "Unknown user"}, status=404)
+        return web.json_response({"tokens": {"access_token": "standin-token"}})
+
+    async def _handle_control(self, request):
+        body = await request.json()
+        for key in ("latency", "events_per_second", "disconnect_every"):
+            if key in body:
+                setattr(self, key, float(body[key]))
+        return web.json_response(self.settings())
+
+    async def _handle_disconnect(self, request):
+        await self.async_disconnect_all()
+        return web.json_response(self.stats)
+
+    async def _handle_stats(self, request):
+        return web.json_response(dict(self.stats, **self.settings()))
+
+    def settings(self):
+        return {"latency": self.latency, "events_per_second": self.events_per_second,
+                "disconnect_every": self.disconnect_every}
+
+    # Websocket
+
+    async def _handle_websocket(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self._clients.add(websocket)
+        self.stats["connections"] += 1
+        try:
+            async for message in websocket:
+                if message.type == WSMsgType.TEXT:
+                    # Answer out of order like the server does, so a slow reply does not hold up the rest
+                    self._tasks.append(asyncio.create_task(self._async_reply(websocket, json.loads(message.data))))
+                    self._tasks = [task for task in self._tasks if not task.done()]
+        finally:
+            self._clients.discard(websocket)
+        return websocket
+
+    async def _async_reply(self, websocket, message):
+        self.stats["messages"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        handler = getattr(self, f"_op_{message['class']}_{message['operation']}", None)
+        items = []
+        written = []
+        for item in message["items"]:
+            if handler is None:
+                items.append({"itemId": item["itemId"], "success": False,
+                              "error": {"code": 404, "message": "Not supported by the stand-in"}})
+                continue
+            payload = handler(item["payload"], written)
+            items.append({"itemId": item["itemId"], "success": True, "payload": payload})
+
+        response = {"direction": "response", "class": message["class"], "operation": message["operation"],
+                    "transactionId": message["transactionId"], "items": items}
+        if not websocket.closed:
+            await websocket.send_json(response)
+        for feature_id, value in written:
+            await self.async_push_event(feature_id, value)
+
+    def _op_user_authenticate(self, payload, written):
+        return {}
+
+    def _op_user_rootGroups(self, payload, written):
+        return {"groupIds": [ROOT_GROUP]}
+
+    def _op_group_hierarchy(self, payload, written):
+        return {"featureSet": self.featuresets}
+
+    def _op_group_read(self, payload, written):
+        return {"devices": self.devices, "features": self.features}
+
+    def _op_feature_read(self, payload, written):
+        return {"value": self.states[payload["featureId"]]}
+
+    def _op_feature_write(self, payload, written):
+        self.stats["writes"] += 1
+        self.states[payload["featureId"]] = payload["value"]
+        written.append((payload["featureId"], payload["value"]))
+        return {}
+
+    async def async_push_event(self, feature_id, value):
+        """Notify every connected client of a feature's new value."""
+        self.states[feature_id] = value
+        self.stats["events"] += 1
+        self.event_times[(feature_id, value)] = time.perf_counter()
+        message = {"direction": "notification", "class": "feature", "operation": "event",
+                   # Never one of the client's own (integer) transaction ids, the link would take it for a response
+                   "transactionId": f"standin-event-{next(self._transactions)}",
+                   "items": [{"itemId": 0, "payload": {"featureId": feature_id, "value": value}}]}
+        for websocket in list(self._clients):
+            if not websocket.closed:
+                await websocket.send_json(message)
+
+    async def async_disconnect_all(self):
+        """Drop every client connection, clients reconnect on their own."""
+        for websocket in list(self._clients):
+            self.stats["disconnects"] += 1
+            await websocket.close()
+
+    # Load generation
+
+    def random_event(self):
+        """Return a (feature_id, value) pair for a random feature that changes its value."""
+        feature_id = self._random.choice(self._event_features)
+        feature_type = self.features[feature_id]["attributes"]["type"]
+        if feature_type in TOGGLED_FEATURES:
+            return feature_id, 0 if self.states[feature_id] else 1
+        return feature_id, self._random.choice(EVENT_VALUES[feature_type])
+
+    async def _async_generate_events(self):
+        loop = asyncio.get_running_loop()
+        next_event = loop.time()
+        while True:
+            if self.events_per_second <= 0:
+                await asyncio.sleep(0.1)
+                next_event = loop.time()
+                continue
+            await self.async_push_event(*self.random_event())
+            # Pace against the clock so the time spent sending does not lower the rate
+            next_event += 1 / self.events_per_second
+            await asyncio.sleep(max(0, next_event - loop.time()))
+
+    async def _async_generate_disconnects(self):
+        while True:
+            if self.disconnect_every <= 0:
+                await asyncio.sleep(0.5)
+                continue
+            await asyncio.sleep(self.disconnect_every)
+            await self.async_disconnect_all()
+
+    # Lifecycle
+
+    async def async_start(self, host="127.0.0.1", port=8765):
+        """Start serving, returns the base URL to configure the integration with."""
+        app = web.Application()
+        app.router.add_post(AUTH_PATH, self._handle_auth)
+        app.router.add_get("/ws", self._handle_websocket)
+        app.router.add_post("/control", self._handle_control)
+        app.router.add_post("/control/disconnect", self._handle_disconnect)
+        app.router.add_get("/stats", self._handle_stats)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self._generators = [asyncio.create_task(self._async_generate_events()),
+                            asyncio.create_task(self._async_generate_disconnects())]
+        return f"http://{host}:{port}"
+
+    async def async_stop(self):
+        for task in self._generators + self._tasks:
+            task.cancel()
+        await self.async_disconnect_all()
+        await self._runner.cleanup()
+
+
+async def async_main(args):
+    server = StandinServer(args.devices, args.latency, args.events_per_second, args.disconnect_every, args.seed)
+    url = await server.async_start(args.host, args.port)
+    print(f"Stand-in server with {args.devices} devices at {url}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            _LOGGER.info("%s", server.stats)
+    finally:
+        await server.async_stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each reply")
+    parser.add_argument("--events-per-second", type=float, default=0.0)
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="seconds between forced disconnects")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
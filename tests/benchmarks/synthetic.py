@@ -0,0 +1,61 @@
+"""Synthetic Lightwave hierarchies for the benchmarks, built from the library's own classes."""
+from lightwave_smart import lightwave_smart as lw
+
+# Product code and initial feature values of each synthetic device type
+DEVICE_TYPES = {
+    "dimmer": ("L21", {"switch": 1, "dimLevel": 50, "rgbColor": 0xff0000, "uiButtonPair": 0, "upgrade": 0,
+                       "protection": 0, "rssi": -60, "power": 10}),
+    "socket": ("L42", {"switch": 1, "socketSetup": 0, "rgbColor": 0, "uiButton": 0, "upgrade": 0, "power": 5,
+                       "energy": 100, "rssi": -70, "voltage": 240, "current": 10, "outletInUse": 1, "protection": 0}),
+    "trv": ("LW922", {"temperature": 200, "targetTemperature": 210, "valveLevel": 100, "valveSetup": 0,
+                      "heatState": 1, "batteryLevel": 80, "rssi": -80, "upgrade": 0}),
+    "relay": ("LW934", {"threeWayRelay": 0, "upgrade": 0, "rssi": -65}),
+    "sensor": ("L41", {"movement": 0, "lightLevel": 100, "batteryLevel": 90, "rssi": -75}),
+}
+
+
+def add_featureset(link, featureset_id, name, product_code, values):
+    """Add a featureset with one feature per entry of values."""
+    featureset = lw.LWRFFeatureSet()
+    featureset.link = link
+    featureset.featureset_id = featureset_id
+    featureset.name = name
+    featureset.product_code = product_code
+    featureset.firmware_version = "1"
+    featureset.manufacturer_code = "LW"
+    featureset.serial = featureset_id
+    for feature_type, value in values.items():
+        feature_id = f"{featureset_id}/{feature_type}"
+        feature = link.features.get(feature_id)
+        if feature is None:
+            cls = lw.LWRFUiButtonFeature if feature_type in ("uiButton", "uiButtonPair") else lw.LWRFFeature
+            feature = cls(feature_id, {"featureId": feature_id, "attributes": {"type": feature_type, "channel": 0}}, link)
+            link.features[feature_id] = feature
+        feature.add_feature_set(featureset)
+        feature.update_feature_state(value)
+        featureset.features[feature_type] = feature
+    link.featuresets[featureset_id] = featureset
+    return featureset
+
+
+def build_hierarchy(link, devices):
+    """Fill link with one hub and the given number of devices, cycling through DEVICE_TYPES."""
+    link.featuresets = {}
+    link.features = {}
+    add_featureset(link, "s-1-100+1", "Link", "L2", {"buttonPress": 0, "rgbColor": 0, "dawnTime": 25000,
+                                                    "duskTime": 70000, "year": 2024, "month": 5, "day": 3,
+                                                    "upgrade": 0, "rssi": -50})
+    types = list(DEVICE_TYPES)
+    for i in range(devices):
+        device_type = types[i % len(types)]
+        product_code, values = DEVICE_TYPES[device_type]
+        add_featureset(link, f"s-{i + 2}-100+1", f"{device_type} {i}", product_code, values)
+    return link
+
+
+def make_link(devices):
+    """Return a bare LWLink2 holding a synthetic hierarchy, nothing is connected."""
+    link = lw.LWLink2.__new__(lw.LWLink2)
+    link._callbacks = []
+    link._feature_set_event_callbacks = {}
+    return build_hierarchy(link, devices)